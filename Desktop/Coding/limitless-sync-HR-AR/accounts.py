@@ -0,0 +1,125 @@
+"""
+Account Profiles
+Reads the accounts one process syncs from a JSON file: a Limitless API key,
+a notes repository and a timezone for each pendant user
+
+Secrets can stay out of the file: `api_key_env` and `github_token_env` name
+environment variables to read instead. See accounts.template.json.
+
+Every account gets its own directory under <cache dir>/accounts/<name> for
+its response cache, search index and archive, since those are keyed by
+date and window only and must not mix two people's lifelogs.
+"""
+
+import json
+import os
+import re
+
+from settings import DEFAULT_ACCOUNT_CONCURRENCY, DEFAULT_ACCOUNTS_FILE, DEFAULT_CACHE_DIR, DEFAULT_RPS, REPO_NAME
+
+NAME_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]*$')
+
+
+class AccountProfile:
+    """One pendant user: where their lifelogs come from and where their notes go"""
+
+    def __init__(self, name, api_key, remote_url, repo_path, timezone, rps=DEFAULT_RPS, data_dir=None):
+        self.name = name
+        self.api_key = api_key
+        self.remote_url = remote_url
+        self.repo_path = repo_path
+        self.timezone = timezone
+        self.rps = rps
+        self.data_dir = data_dir or os.path.join(DEFAULT_CACHE_DIR, 'accounts', name)
+
+    @property
+    def cache_dir(self):
+        return os.path.join(self.data_dir, 'cache')
+
+    @property
+    def search_db(self):
+        return os.path.join(self.data_dir, 'search.sqlite')
+
+    @property
+    def archive_dir(self):
+        return os.path.join(self.data_dir, 'archive')
+
+    def __repr__(self):
+        return f"AccountProfile({self.name!r}, repo_path={self.repo_path!r}, timezone={self.timezone!r})"
+
+
+def _secret(entry, key, name, default=None):
+    """entry[key], or the environment variable named by entry[key + '_env']"""
+    if entry.get(key):
+        return entry[key]
+    env_name = entry.get(f'{key}_env')
+    if env_name:
+        value = os.environ.get(env_name)
+        if not value:
+            raise ValueError(f"Account {name!r}: environment variable {env_name} is not set")
+        return value
+    return default
+
+
+def parse_account(entry, defaults):
+    """Build an AccountProfile from one entry of the accounts file"""
+    name = entry.get('name')
+    if not name or not NAME_PATTERN.match(name):
+        raise ValueError(f"Every account needs a name of letters, digits, '.', '_' or '-' (got {name!r})")
+
+    api_key = _secret(entry, 'api_key', name)
+    if not api_key:
+        raise ValueError(f"Account {name!r}: set api_key or api_key_env")
+
+    remote_url = entry.get('remote_url')
+    if not remote_url:
+        github_repo = entry.get('github_repo')
+        if not github_repo:
+            raise ValueError(f"Account {name!r}: set remote_url or github_repo (owner/name)")
+        token = _secret(entry, 'github_token', name, os.environ.get('GITHUB_TOKEN'))
+        if not token:
+            raise ValueError(f"Account {name!r}: no GitHub token (github_token, github_token_env or GITHUB_TOKEN)")
+        remote_url = f"https://{token}@github.com/{github_repo}.git"
+
+    repo_path = entry.get('repo_path') or f"~/Documents/{REPO_NAME}-{name}"
+    return AccountProfile(
+        name,
+        api_key,
+        remote_url,
+        os.path.abspath(os.path.expanduser(repo_path)),
+        entry.get('timezone') or defaults['timezone'],
+        rps=float(entry.get('rps', defaults['rps'])),
+        data_dir=os.path.abspath(os.path.expanduser(entry['data_dir'])) if entry.get('data_dir') else None
+    )
+
+
+def load_accounts(path=DEFAULT_ACCOUNTS_FILE):
+    """
+    Read an accounts file; returns (profiles, concurrency)
+
+    The file is {"concurrency": N, "timezone": ..., "rps": ..., "accounts": [...]};
+    the top-level timezone and rps are defaults for accounts that set none.
+    """
+    with open(os.path.expanduser(path), 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if isinstance(config, list):
+        config = {'accounts': config}
+
+    defaults = {
+        'timezone': config.get('timezone') or os.environ.get('TIMEZONE', 'America/Los_Angeles'),
+        'rps': config.get('rps', DEFAULT_RPS),
+    }
+    profiles = [parse_account(entry, defaults) for entry in config.get('accounts', [])]
+    if not profiles:
+        raise ValueError(f"No accounts listed in {path}")
+
+    for attr in ('name', 'repo_path', 'data_dir'):
+        seen = set()
+        for profile in profiles:
+            value = getattr(profile, attr)
+            if value in seen:
+                raise ValueError(f"Two accounts share the same {attr}: {value}")
+            seen.add(value)
+
+    concurrency = int(config.get('concurrency', DEFAULT_ACCOUNT_CONCURRENCY))
+    return profiles, max(1, concurrency)
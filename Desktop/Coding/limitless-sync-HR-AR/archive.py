@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Lifelog Archive
+Columnar Arrow IPC dataset of every transcript segment, partitioned by
+year and month, with a `stats` command for per-day analytics
+
+Each day written is appended as its own file under year=YYYY/month=MM/;
+compaction folds a month's day files into one sorted file. Files are
+uncompressed Arrow IPC so reads are memory-mapped rather than parsed, and
+the statistics are computed with Arrow's vectorised kernels.
+
+pyarrow is optional; without it the archive is simply not written.
+
+Usage:
+    python3 archive.py stats --since 2024-01-01 --until 2024-12-31
+    python3 archive.py stats --speakers
+    python3 archive.py compact
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import date as date_type
+from pathlib import Path
+
+from cli_args import add_stats_arguments
+from settings import DEFAULT_ARCHIVE_DIR
+from timestamps import parse_epoch_ms
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow is optional; without it nothing is archived
+    pa = None
+
+ARCHIVE_AVAILABLE = pa is not None
+
+# Compact a month once it has this many uncompacted day files
+DEFAULT_COMPACT_PARTS = 8
+
+COMPACTED_NAME = 'month.arrow'
+HASHES_KEY = b'content_hashes'
+
+
+def schema():
+    return pa.schema([
+        ('date', pa.date32()),
+        ('lifelog_id', pa.string()),
+        ('title', pa.string()),
+        ('item', pa.int32()),
+        ('type', pa.dictionary(pa.int8(), pa.string())),
+        ('speaker', pa.dictionary(pa.int32(), pa.string())),
+        ('start', pa.timestamp('ms', tz='UTC')),
+        ('end', pa.timestamp('ms', tz='UTC')),
+        ('duration_ms', pa.int64()),
+        ('words', pa.int32()),
+        ('text', pa.string()),
+    ])
+
+
+def flatten(date, lifelogs):
+    """One row per contents item of a day's lifelogs, as an Arrow table"""
+    ids, titles, items, types, speakers, texts, starts, ends = [], [], [], [], [], [], [], []
+    for log in lifelogs:
+        for idx, item in enumerate(log.get('contents') or []):
+            ids.append(log.get('id'))
+            titles.append(log.get('title'))
+            items.append(idx)
+            types.append(item.get('type'))
+            speakers.append(item.get('speakerName'))
+            texts.append(item.get('content') or '')
+            starts.append(item.get('startTime'))
+            ends.append(item.get('endTime'))
+
+    start_ms = parse_epoch_ms(starts)
+    end_ms = parse_epoch_ms(ends)
+    duration = [
+        e - s if s is not None and e is not None and e >= s else None
+        for s, e in zip(start_ms, end_ms)
+    ]
+    day = date_type.fromisoformat(date)
+    fields = schema()
+    return pa.table([
+        pa.array([day] * len(ids), fields.field('date').type),
+        pa.array(ids, pa.string()),
+        pa.array(titles, pa.string()),
+        pa.array(items, pa.int32()),
+        pa.array(types, pa.string()).dictionary_encode().cast(fields.field('type').type),
+        pa.array(speakers, pa.string()).dictionary_encode().cast(fields.field('speaker').type),
+        pa.array(start_ms, pa.int64()).cast(fields.field('start').type),
+        pa.array(end_ms, pa.int64()).cast(fields.field('end').type),
+        pa.array(duration, pa.int64()),
+        pc.cast(pc.list_value_length(pc.utf8_split_whitespace(pa.array(texts, pa.string()))), pa.int32()),
+        pa.array(texts, pa.string()),
+    ], schema=fields)
+
+
+def _write(path, table, hashes):
+    """Write an uncompressed IPC file atomically, recording content hashes in its metadata"""
+    table = table.replace_schema_metadata({HASHES_KEY: json.dumps(hashes, sort_keys=True).encode()})
+    tmp_path = path.with_suffix('.tmp')
+    with pa.OSFile(str(tmp_path), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def _hashes(schema):
+    return json.loads((schema.metadata or {}).get(HASHES_KEY, b'{}'))
+
+
+def _read(path):
+    """Memory-map an IPC file; returns (table, {date: content hash})"""
+    with pa.memory_map(str(path), 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table, _hashes(table.schema)
+
+
+def _read_hashes(path):
+    """Content hashes from an IPC file's footer without touching its data"""
+    with pa.memory_map(str(path), 'r') as source:
+        return _hashes(pa.ipc.open_file(source).schema)
+
+
+class LifelogArchive:
+    """
+    Partitioned archive rooted at `root`
+
+    append_day() is a no-op when the day was already archived from content
+    with the same hash. Call it from one thread at a time.
+    """
+
+    def __init__(self, root=DEFAULT_ARCHIVE_DIR, compact_parts=DEFAULT_COMPACT_PARTS):
+        if not ARCHIVE_AVAILABLE:
+            raise ImportError("pyarrow is required for the lifelog archive (pip install pyarrow)")
+        self.root = Path(root)
+        self.compact_parts = compact_parts
+
+    def month_dir(self, date):
+        return self.root / f"year={date[:4]}" / f"month={date[5:7]}"
+
+    def archived_hash(self, date):
+        month = self.month_dir(date)
+        part = month / f"day-{date}.arrow"
+        if part.exists():
+            return _read_hashes(part).get(date)
+        compacted = month / COMPACTED_NAME
+        if compacted.exists():
+            return _read_hashes(compacted).get(date)
+        return None
+
+    def append_day(self, date, lifelogs, digest=None):
+        """Write a day's segments as its own file; returns True if anything was written"""
+        if digest and self.archived_hash(date) == digest:
+            return False
+        month = self.month_dir(date)
+        month.mkdir(parents=True, exist_ok=True)
+        _write(month / f"day-{date}.arrow", flatten(date, lifelogs), {date: digest})
+        if len(list(month.glob('day-*.arrow'))) >= self.compact_parts:
+            self.compact_month(month)
+        return True
+
+    def read_month(self, month):
+        """A month's rows and hashes; day files override the compacted file for their dates"""
+        parts = sorted(month.glob('day-*.arrow'))
+        tables, hashes = [], {}
+        compacted = month / COMPACTED_NAME
+        if compacted.exists():
+            table, hashes = _read(compacted)
+            if parts:
+                replaced = pa.array([date_type.fromisoformat(p.stem[4:]) for p in parts], pa.date32())
+                table = table.filter(pc.invert(pc.is_in(table['date'], value_set=replaced)))
+            tables.append(table)
+        for part in parts:
+            table, part_hashes = _read(part)
+            tables.append(table)
+            hashes.update(part_hashes)
+        if not tables:
+            return schema().empty_table(), hashes
+        table = pa.concat_tables([t.replace_schema_metadata(None) for t in tables]).unify_dictionaries()
+        return table, hashes
+
+    def compact_month(self, month):
+        """Fold a month's day files into its single sorted file"""
+        if not any(month.glob('day-*.arrow')):
+            return False
+        table, hashes = self.read_month(month)
+        table = table.sort_by([('date', 'ascending'), ('start', 'ascending'), ('item', 'ascending')])
+        _write(month / COMPACTED_NAME, table.combine_chunks(), hashes)
+        for part in month.glob('day-*.arrow'):
+            part.unlink()
+        return True
+
+    def months(self, since=None, until=None):
+        """Month directories overlapping [since, until], oldest first"""
+        first = since[:7] if since else None
+        last = until[:7] if until else None
+        for month in sorted(self.root.glob('year=*/month=*')):
+            key = f"{month.parent.name[5:]}-{month.name[6:]}"
+            if (first and key < first) or (last and key > last):
+                continue
+            yield month
+
+    def compact(self):
+        return sum(self.compact_month(month) for month in self.months())
+
+    def read(self, since=None, until=None):
+        """Every archived row with a date in [since, until]"""
+        tables = [self.read_month(month)[0] for month in self.months(since, until)]
+        if not tables:
+            return schema().empty_table()
+        table = pa.concat_tables(tables).unify_dictionaries()
+        if since:
+            table = table.filter(pc.greater_equal(table['date'], pa.scalar(date_type.fromisoformat(since))))
+        if until:
+            table = table.filter(pc.less_equal(table['date'], pa.scalar(date_type.fromisoformat(until))))
+        return table
+
+
+def daily_stats(table):
+    """Per day: conversations, segments, talk minutes and words (spoken segments only)"""
+    spoken = table.filter(pc.equal(table['type'].cast(pa.string()), 'blockquote'))
+    per_day = spoken.group_by('date').aggregate([
+        ('lifelog_id', 'count_distinct'),
+        ('text', 'count'),
+        ('duration_ms', 'sum'),
+        ('words', 'sum'),
+    ])
+    return per_day.sort_by('date')
+
+
+def speaker_share(table):
+    """Talk time and words per speaker, with each speaker's share of the total talk time"""
+    spoken = table.filter(pc.equal(table['type'].cast(pa.string()), 'blockquote'))
+    spoken = spoken.set_column(
+        spoken.schema.get_field_index('speaker'), 'speaker',
+        pc.fill_null(spoken['speaker'].cast(pa.string()), 'Unknown')
+    )
+    per_speaker = spoken.group_by('speaker').aggregate([('duration_ms', 'sum'), ('words', 'sum')])
+    total = pc.sum(per_speaker['duration_ms_sum']).as_py() or 0
+    share = pc.divide(pc.cast(per_speaker['duration_ms_sum'], pa.float64()), float(total or 1))
+    return per_speaker.append_column('share', share).sort_by([('duration_ms_sum', 'descending')])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analytics over the local lifelog archive')
+    parser.add_argument('--archive-dir', default=DEFAULT_ARCHIVE_DIR, help=f'Archive root (default: {DEFAULT_ARCHIVE_DIR})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    stats = commands.add_parser('stats', help='Per-day talk time, words and speaker share')
+    # Shared with `limitless_sync.py stats` (cli_args.py)
+    add_stats_arguments(stats)
+    commands.add_parser('compact', help='Fold day files into one file per month')
+
+    args = parser.parse_args()
+    if args.command == 'compact':
+        if not ARCHIVE_AVAILABLE:
+            print("pyarrow is not installed (pip install pyarrow)")
+            return
+        print(f"Compacted {LifelogArchive(args.archive_dir).compact()} month(s)")
+        return
+    run_stats(args)
+
+
+def run_stats(args):
+    """Print per-day and per-speaker statistics for a parsed stats command"""
+    if not ARCHIVE_AVAILABLE:
+        print("pyarrow is not installed (pip install pyarrow)")
+        return
+    archive = LifelogArchive(args.archive_dir)
+
+    start = time.perf_counter()
+    table = archive.read(args.since, args.until)
+    if not args.speakers:
+        print(f"{'Date':<12} {'Convos':>7} {'Segments':>9} {'Talk min':>9} {'Words':>8}")
+        for row in daily_stats(table).to_pylist():
+            minutes = (row['duration_ms_sum'] or 0) / 60000
+            print(f"{row['date']!s:<12} {row['lifelog_id_count_distinct']:>7} {row['text_count']:>9} "
+                  f"{minutes:>9.1f} {row['words_sum'] or 0:>8}")
+        print()
+    print(f"{'Speaker':<24} {'Talk min':>9} {'Words':>8} {'Share':>7}")
+    for row in speaker_share(table).to_pylist():
+        minutes = (row['duration_ms_sum'] or 0) / 60000
+        print(f"{row['speaker'][:24]:<24} {minutes:>9.1f} {row['words_sum'] or 0:>8} {row['share']:>6.1%}")
+    print(f"\n{table.num_rows:,} segments in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
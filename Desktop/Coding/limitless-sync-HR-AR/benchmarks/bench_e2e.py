@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+End-to-End Benchmark
+Runs bulk_import, retry_failed, sync_daily, direct_odb and bare_clone
+against the mock Limitless API (benchmarks/mock_api.py) and a temporary
+bare git remote
+
+Each scenario runs in a fresh process so its peak RSS is its own. Request
+latency percentiles, bytes served and 429s are measured by the mock server.
+direct_odb imports the whole range again, into a remote and clone of its
+own, with --direct-odb; bare_clone does the same from a --bare clone. Both
+fail unless the commit reached the remote, and direct_odb also unless it
+left a clean worktree.
+Nothing outside the temporary directory is touched.
+
+Usage:
+    python3 benchmarks/bench_e2e.py
+    python3 benchmarks/bench_e2e.py --days 365 --latency-ms 40 --jitter-ms 20 --concurrency 16
+    python3 benchmarks/bench_e2e.py --throttle-rate 0.05 --retry-after 1 --scenarios bulk_import
+    python3 benchmarks/bench_e2e.py --drop-rate 0.1 --scenarios bulk_import sync_daily
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_api import Corpus, MockLimitlessServer  # noqa: E402
+
+SCENARIOS = ('bulk_import', 'retry_failed', 'sync_daily', 'direct_odb', 'bare_clone')
+# Scenarios that import into a remote and clone of their own
+FRESH_CLONE = ('direct_odb', 'bare_clone')
+GIT_IDENTITY = {
+    'GIT_AUTHOR_NAME': 'Benchmark', 'GIT_AUTHOR_EMAIL': 'bench@example.invalid',
+    'GIT_COMMITTER_NAME': 'Benchmark', 'GIT_COMMITTER_EMAIL': 'bench@example.invalid',
+}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and its finished children, in MB"""
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def make_remote(workdir, name='remote'):
+    """A bare repository with one commit on main, served over file:// so shallow and partial clones work"""
+    remote = os.path.join(workdir, f'{name}.git')
+    seed = os.path.join(workdir, f'{name}-seed')
+    run = lambda *args, cwd=None: subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True)
+    run('init', '--bare', '-b', 'main', remote)
+    run('config', 'uploadpack.allowFilter', 'true', cwd=remote)
+    run('init', '-b', 'main', seed)
+    run('commit', '--allow-empty', '-m', 'Initial commit', cwd=seed)
+    run('push', remote, 'main', cwd=seed)
+    shutil.rmtree(seed)
+    return f"file://{remote}"
+
+
+def check_committed(repo, start_sha):
+    """Fail unless the run committed, pushed and left nothing behind in the worktree"""
+    head = repo.head.commit.hexsha
+    if head == start_sha:
+        raise RuntimeError("Nothing was committed")
+    remote_head = repo.git.ls_remote('origin', f"refs/heads/{repo.active_branch.name}").split()
+    if not remote_head or remote_head[0] != head:
+        raise RuntimeError("The commit was not pushed")
+    if not repo.bare and repo.is_dirty(untracked_files=True):
+        raise RuntimeError(f"Worktree left dirty:\n{repo.git.status('--short')}")
+
+
+def run_scenario(name, options, results):
+    """Child process: run one scenario and report its timing and memory"""
+    if not options['verbose']:
+        sys.stdout = open(os.devnull, 'w')
+    if name in FRESH_CLONE:
+        # A remote and clone of its own, so every day is new to it; read when settings is imported
+        os.environ['HOME'] = os.path.join(options['workdir'], f'home-{name}')
+        os.environ['LIMITLESS_REMOTE_URL'] = make_remote(options['workdir'], f'remote-{name}')
+        os.makedirs(os.path.join(os.environ['HOME'], 'Documents'))
+    started = time.perf_counter()
+
+    if name == 'sync_daily':
+        from limitless_to_github import LimitlessToGitHub
+        LimitlessToGitHub().sync_daily(lookback_days=options['lookback_days'])
+        days = options['lookback_days'] + 1
+    else:
+        from bulk_import_limitless import LimitlessBulkImporter
+        from journal import FAILED
+        importer = LimitlessBulkImporter(
+            rps=options['rps'],
+            concurrency=options['concurrency'],
+            render_workers=options['render_workers'],
+            cache_dir=None,
+            direct_odb=name == 'direct_odb',
+            bare=name == 'bare_clone'
+        )
+        if name in FRESH_CLONE:
+            days = options['days']
+            start_sha = importer.repo.head.commit.hexsha
+            importer.bulk_import(options['start_date'], options['end_date'], concurrency=options['concurrency'])
+            check_committed(importer.repo, start_sha)
+        elif name == 'bulk_import':
+            days = options['days']
+            importer.bulk_import(options['start_date'], options['end_date'], concurrency=options['concurrency'])
+        else:
+            days = len(importer.journal.dates(FAILED))
+            importer.retry_failed(options['concurrency'], rounds=1)
+
+    results.put({'elapsed': time.perf_counter() - started, 'days': days, 'peak_rss_mb': peak_rss_mb()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the importer and daily sync against a local mock API')
+    parser.add_argument('--days', type=int, default=30, help='Days of history to import (default: 30)')
+    parser.add_argument('--lifelogs-per-day', type=int, default=4, help='Conversations per day (default: 4)')
+    parser.add_argument('--segments', type=int, default=60, help='Segments per conversation (default: 60)')
+    parser.add_argument('--latency-ms', type=float, default=20, help='Mock response delay (default: 20)')
+    parser.add_argument('--jitter-ms', type=float, default=10, help='Random +/- spread on the delay (default: 10)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with each 429')
+    parser.add_argument('--drop-rate', type=float, default=0.0,
+                        help='Fraction of 200 responses cut off half way through the body')
+    parser.add_argument('--fail-days', type=int, default=3, help='Days answered 500 during bulk_import (default: 3)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight (default: 8)')
+    parser.add_argument('--render-workers', type=int, default=2, help='Render processes (default: 2)')
+    parser.add_argument('--rps', type=float, default=0, help='Client rate limit, 0 for none (default: 0)')
+    parser.add_argument('--lookback-days', type=int, default=2, help='sync_daily lookback (default: 2)')
+    parser.add_argument('--timezone', default='America/Los_Angeles')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--verbose', action='store_true', help='Show the importer output')
+    parser.add_argument('--keep', action='store_true', help='Keep the temporary directory')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='limitless-bench-')
+    os.environ.update(GIT_IDENTITY)
+    corpus = Corpus(args.days, args.lifelogs_per_day, args.segments, timezone=args.timezone)
+    start_date, end_date = corpus.first_date.isoformat(), corpus.last_date.isoformat()
+    # Spread the failing days over the range
+    step = max(1, args.days // max(1, args.fail_days))
+    fail_dates = [(corpus.first_date + timedelta(days=i)).isoformat() for i in range(0, args.days, step)]
+    fail_dates = fail_dates[:args.fail_days]
+
+    server = MockLimitlessServer(
+        corpus, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after, fail_dates=fail_dates, drop_rate=args.drop_rate
+    ).start()
+
+    # Read by the child processes at import time
+    os.environ.update({
+        'HOME': os.path.join(workdir, 'home'),
+        'LIMITLESS_API_KEY': 'benchmark',
+        'LIMITLESS_API_URL': server.url,
+        'LIMITLESS_REMOTE_URL': make_remote(workdir),
+        'LIMITLESS_CACHE_DIR': os.path.join(workdir, 'cache'),
+        'TIMEZONE': args.timezone,
+    })
+    os.makedirs(os.path.join(workdir, 'home', 'Documents'))
+
+    options = {
+        'days': args.days, 'start_date': start_date, 'end_date': end_date,
+        'concurrency': args.concurrency, 'render_workers': args.render_workers, 'rps': args.rps,
+        'lookback_days': args.lookback_days, 'verbose': args.verbose, 'workdir': workdir,
+    }
+    print(f"Corpus: {args.days} days x {args.lifelogs_per_day} lifelogs x {args.segments} segments, "
+          f"latency {args.latency_ms:g}±{args.jitter_ms:g} ms, 429 rate {args.throttle_rate:g}, "
+          f"drop rate {args.drop_rate:g}, "
+          f"{len(fail_dates)} failing day(s)")
+    print(f"Work directory: {workdir}\n")
+    print(f"{'Scenario':<14} {'Days':>5} {'Secs':>7} {'Days/s':>7} {'MB/s':>7} {'Reqs':>6} "
+          f"{'p50 ms':>7} {'p99 ms':>7} {'429s':>5} {'Drops':>5} {'RSS MB':>7}")
+
+    context = multiprocessing.get_context('spawn')
+    try:
+        for name in args.scenarios:
+            server.failing = name == 'bulk_import'
+            server.stats.reset()
+            results = context.Queue()
+            child = context.Process(target=run_scenario, args=(name, options, results))
+            child.start()
+            child.join()
+            if child.exitcode != 0:
+                print(f"{name:<14} failed (exit code {child.exitcode}); rerun with --verbose")
+                continue
+            result = results.get()
+            stats = server.stats.snapshot()
+            elapsed = result['elapsed']
+            print(f"{name:<14} {result['days']:>5} {elapsed:>7.2f} {result['days'] / elapsed:>7.1f} "
+                  f"{stats['bytes'] / elapsed / 1e6:>7.2f} {stats['requests']:>6} {stats['p50_ms']:>7.1f} "
+                  f"{stats['p99_ms']:>7.1f} {stats['statuses'].get(429, 0):>5} "
+                  f"{stats['statuses'].get('dropped', 0):>5} {result['peak_rss_mb']:>7.1f}")
+    finally:
+        server.shutdown()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Render Benchmark
+Compares the original string-concatenation renderer against each registered
+output format on a synthetic day with many transcript segments
+
+Usage:
+    python3 benchmarks/bench_render.py
+    python3 benchmarks/bench_render.py --segments 100000 --repeat 5
+    python3 benchmarks/bench_render.py --formats markdown html
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rendering import RENDERERS, iter_render, write_atomic  # noqa: E402
+
+DATE = '2024-06-01'
+
+
+def synthetic_day(segments, per_lifelog=500):
+    """Build a list of lifelogs totalling `segments` contents items"""
+    start = datetime(2024, 6, 1, 15, 0, 0)
+    lifelogs = []
+    for n in range(0, segments, per_lifelog):
+        contents = [{"type": "heading1", "content": f"Conversation {n // per_lifelog + 1}"}]
+        for i in range(n, min(n + per_lifelog, segments)):
+            ts = (start + timedelta(seconds=i * 3)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+            contents.append({
+                "type": "blockquote",
+                "content": f"Segment {i}: the quick brown fox jumps over the lazy dog again and again.",
+                "speakerName": "Speaker A" if i % 3 else "You",
+                "startTime": ts,
+                "endTime": ts
+            })
+        lifelogs.append({"id": f"log-{n}", "contents": contents})
+    return lifelogs
+
+
+def legacy_render(data, date):
+    """The pre-streaming renderer: one string grown with += per item"""
+    date_obj = datetime.strptime(date, '%Y-%m-%d')
+    content = f"# Daily Notes - {date_obj.strftime('%B %d, %Y')}\n\n## Lifelogs\n\n"
+    for idx, log in enumerate(data, 1):
+        content += f"\n### Lifelog {idx}\n"
+        for item in log['contents']:
+            item_type = item.get('type', '')
+            item_content = item.get('content', '')
+            if item_type == 'heading1':
+                content += f"\n# {item_content}\n"
+            elif item_type == 'heading2':
+                content += f"\n## {item_content}\n"
+            elif item_type == 'blockquote':
+                speaker = item.get('speakerName', 'Unknown')
+                start_time = item.get('startTime', '')
+                if start_time:
+                    try:
+                        st = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+                        time_str = st.strftime('%H:%M:%S')
+                        content += f"\n**[{time_str}] {speaker}:**\n> {item_content}\n"
+                    except ValueError:
+                        content += f"\n**{speaker}:**\n> {item_content}\n"
+                else:
+                    content += f"\n**{speaker}:**\n> {item_content}\n"
+            else:
+                content += f"\n{item_content}\n"
+        content += "\n---\n"
+    return content
+
+
+def run_legacy(data, path):
+    content = legacy_render(data, DATE)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def streaming(fmt):
+    def run(data, path):
+        write_atomic(path, iter_render(data, DATE, fmt))
+    return run
+
+
+def measure(fn, data, path, repeat):
+    """Return (best seconds, peak traced bytes) over `repeat` runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data, path)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(data, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark note rendering')
+    parser.add_argument('--segments', type=int, default=50000, help='Segments in the synthetic day (default: 50000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per renderer (default: 3)')
+    parser.add_argument('--formats', nargs='+', default=sorted(RENDERERS), choices=sorted(RENDERERS),
+                        help='Output formats to benchmark (default: all)')
+    args = parser.parse_args()
+
+    data = synthetic_day(args.segments)
+    print(f"Synthetic day: {args.segments} segments in {len(data)} lifelogs\n")
+    print(f"{'Renderer':<12} {'Best time':>10} {'Segments/s':>12} {'Peak memory':>12} {'Output':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [('legacy', run_legacy)] + [(fmt, streaming(fmt)) for fmt in args.formats]
+        for name, fn in runs:
+            path = os.path.join(tmp, f"{name}.out")
+            seconds, peak = measure(fn, data, path, args.repeat)
+            size = os.path.getsize(path)
+            print(f"{name:<12} {seconds:>9.3f}s {args.segments / seconds:>12,.0f} "
+                  f"{peak / 1024 / 1024:>10.1f}MB {size / 1024 / 1024:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Times how long each command line entry point takes to start, and which heavy
+modules it loads before doing any work
+
+Every command runs in a fresh interpreter with a temporary HOME and cache
+directory, so no notes repository, journal or cache is found and nothing
+outside the temporary directory is touched. The median of --runs runs is
+reported. The legacy rows show what the old entry points cost: --help of
+the bulk importer and of the daily sync, which import everything up front.
+
+Usage:
+    python3 benchmarks/bench_startup.py
+    python3 benchmarks/bench_startup.py --runs 20
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+HEAVY_MODULES = ('requests', 'git', 'numpy', 'pyarrow', 'ijson')
+
+COMMANDS = [
+    ('--help', ['limitless_sync.py', '--help']),
+    ('import --help', ['limitless_sync.py', 'import', '--help']),
+    ('import --dry-run', ['limitless_sync.py', 'import', '--dry-run', '--days-back', '30']),
+    ('retry --dry-run', ['limitless_sync.py', 'retry', '--dry-run']),
+    ('sync --dry-run', ['limitless_sync.py', 'sync', '--dry-run']),
+    ('search --help', ['limitless_sync.py', 'search', '--help']),
+    ('legacy import --help', ['bulk_import_limitless.py', '--help']),
+    ('legacy sync --help', ['limitless_to_github.py', '--help']),
+]
+
+
+def run_once(argv, env, importtime=False):
+    """Run one command; returns (seconds, stderr)"""
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + argv
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} exited with {result.returncode}:\n{result.stderr}")
+    return elapsed, result.stderr
+
+
+def heavy_imports(stderr):
+    """Top-level heavy packages named in -X importtime output"""
+    loaded = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        name = line.rsplit('|', 1)[-1].strip()
+        package = name.split('.')[0]
+        if package in HEAVY_MODULES:
+            loaded.add(package)
+    return [name for name in HEAVY_MODULES if name in loaded]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the start-up of each command line entry point')
+    parser.add_argument('--runs', type=int, default=10, help='Runs per command; the median is reported (default: 10)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='limitless-startup-')
+    env = dict(os.environ)
+    env.update({
+        'HOME': workdir,
+        'LIMITLESS_CACHE_DIR': os.path.join(workdir, 'cache'),
+        'LIMITLESS_ACCOUNTS': os.path.join(workdir, 'accounts.json'),
+    })
+    for name in ('LIMITLESS_SEARCH_DB', 'LIMITLESS_ARCHIVE_DIR', 'LIMITLESS_METRICS_DIR'):
+        env.pop(name, None)
+
+    print(f"{'Command':<22} {'Median ms':>10} {'Min ms':>8}  Heavy modules loaded")
+    try:
+        for label, argv in COMMANDS:
+            # One untimed run warms the bytecode and OS file caches
+            _, stderr = run_once(argv, env, importtime=True)
+            timings = [run_once(argv, env)[0] * 1000 for _ in range(args.runs)]
+            loaded = ', '.join(heavy_imports(stderr)) or '-'
+            print(f"{label:<22} {statistics.median(timings):>10.1f} {min(timings):>8.1f}  {loaded}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Mock Limitless API
+Local stand-in for api.limitless.ai/v1/lifelogs serving a synthetic corpus,
+with configurable latency, page size, 429 throttling, failing dates and
+connections dropped part way through a body
+
+The corpus is deterministic: the same options always produce the same
+lifelogs, ending today in the requested timezone. Request latencies, bytes
+served and status codes are recorded for the benchmark harness.
+
+Usage:
+    python3 benchmarks/mock_api.py --days 30 --port 8787
+    LIMITLESS_API_URL=http://127.0.0.1:8787/v1 python3 bulk_import_limitless.py --days-back 30
+
+    python3 benchmarks/mock_api.py --latency-ms 80 --throttle-rate 0.05 --retry-after 2
+    python3 benchmarks/mock_api.py --drop-rate 0.1
+"""
+
+import argparse
+import gzip
+import json
+import math
+import random
+import threading
+import time
+from datetime import date as date_type, datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from zoneinfo import ZoneInfo
+
+MAX_PAGE_SIZE = 10
+SPEAKERS = ['You', 'Alex', 'Sam', 'Jordan', 'Unknown']
+WORDS = ('the quick brown fox jumps over a lazy dog while we talk about budgets, '
+         'roadmaps, lunch plans and the weather this week').split()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of `values` (0 when empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def _iso(dt):
+    return dt.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+class Corpus:
+    """
+    `days` days of lifelogs ending on `end_date`, each day holding
+    `lifelogs_per_day` conversations of `segments` transcript segments
+    """
+
+    def __init__(self, days=30, lifelogs_per_day=4, segments=60, end_date=None,
+                 timezone='America/Los_Angeles', seed=1):
+        self.zone = ZoneInfo(timezone)
+        end = date_type.fromisoformat(end_date) if end_date else datetime.now(self.zone).date()
+        self.first_date = end - timedelta(days=days - 1)
+        self.last_date = end
+        rng = random.Random(seed)
+        self.lifelogs = []
+        for offset in range(days - 1, -1, -1):
+            day = end - timedelta(days=offset)
+            for n in range(lifelogs_per_day):
+                # Conversations spread over the local day from 08:00
+                start = datetime(day.year, day.month, day.day, 8, tzinfo=self.zone) + timedelta(hours=3 * n)
+                self.lifelogs.append(self._lifelog(rng, day, n, start, segments))
+        self.lifelogs.sort(key=lambda log: log['startTime'])
+
+    def _lifelog(self, rng, day, n, start, segments):
+        contents = [{'type': 'heading1', 'content': f'Conversation {n + 1}', 'children': []}]
+        clock = start
+        for i in range(segments):
+            if i % 20 == 0:
+                contents.append({'type': 'heading2', 'content': f'Topic {i // 20 + 1}', 'children': []})
+            length = timedelta(seconds=rng.randint(2, 20))
+            speaker = rng.choice(SPEAKERS)
+            contents.append({
+                'type': 'blockquote',
+                'content': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 30))),
+                'speakerName': speaker,
+                'speakerIdentifier': 'user' if speaker == 'You' else None,
+                'startTime': _iso(clock),
+                'endTime': _iso(clock + length),
+                'startOffsetMs': int((clock - start).total_seconds() * 1000),
+                'endOffsetMs': int((clock + length - start).total_seconds() * 1000),
+                'children': []
+            })
+            clock += length
+        return {
+            'id': f'mock-{day.isoformat()}-{n}',
+            'title': f'Conversation {n + 1} on {day.isoformat()}',
+            'markdown': '\n'.join(item['content'] for item in contents),
+            'startTime': _iso(start),
+            'endTime': _iso(clock),
+            'isStarred': False,
+            'updatedAt': _iso(clock),
+            'contents': contents
+        }
+
+    def _bound(self, value, zone, end=False):
+        """Epoch-comparable UTC ISO string for a YYYY-MM-DD[ HH:MM:SS] bound in `zone`"""
+        if len(value) == 10:
+            value += ' 23:59:59' if end else ' 00:00:00'
+        local = datetime.strptime(value, '%Y-%m-%d %H:%M:%S').replace(tzinfo=zone)
+        return _iso(local)
+
+    def select(self, date=None, start=None, end=None, tz_name=None, direction='asc'):
+        zone = ZoneInfo(tz_name) if tz_name else dt_timezone.utc
+        if date:
+            start, end = date, date
+        low = self._bound(start, zone) if start else None
+        high = self._bound(end, zone, end=True) if end else None
+        logs = [
+            log for log in self.lifelogs
+            if (low is None or log['startTime'] >= low) and (high is None or log['startTime'] <= high)
+        ]
+        return logs[::-1] if direction == 'desc' else logs
+
+
+class MockStats:
+    """Thread-safe request counters; snapshot() and reset() are used between benchmark runs"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.latencies = []
+            self.bytes_sent = 0
+            self.statuses = {}
+
+    def record(self, status, seconds, size):
+        with self.lock:
+            self.latencies.append(seconds)
+            self.bytes_sent += size
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'requests': len(self.latencies),
+                'bytes': self.bytes_sent,
+                'statuses': dict(self.statuses),
+                'p50_ms': percentile(self.latencies, 50) * 1000,
+                'p99_ms': percentile(self.latencies, 99) * 1000,
+            }
+
+
+class MockLimitlessServer(ThreadingHTTPServer):
+    """
+    HTTP server for the mock API
+
+    Args:
+        latency_ms / jitter_ms: Delay added before every response
+        throttle_rate: Fraction of requests answered 429 with `retry_after` seconds
+        fail_dates: Dates (YYYY-MM-DD) answered 500 until failing is switched off
+        drop_rate: Fraction of 200 responses whose connection is closed half
+            way through the body, after the full Content-Length was sent
+    """
+
+    daemon_threads = True
+
+    def __init__(self, corpus, host='127.0.0.1', port=0, latency_ms=0, jitter_ms=0,
+                 throttle_rate=0.0, retry_after=1, fail_dates=(), drop_rate=0.0, seed=1):
+        super().__init__((host, port), MockHandler)
+        self.corpus = corpus
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.fail_dates = set(fail_dates)
+        self.drop_rate = drop_rate
+        self.failing = True
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.stats = MockStats()
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/v1"
+
+    def roll(self):
+        with self.rng_lock:
+            return self.rng.random(), self.rng.uniform(-1, 1)
+
+    def start(self):
+        """Serve from a daemon thread; returns self"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status, body, started, headers=None, drop=False):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if len(data) > 1024 and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            data = gzip.compress(data, compresslevel=5)
+            self.send_header('Content-Encoding', 'gzip')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if drop:
+            # The client sees a body shorter than its Content-Length
+            self.wfile.write(data[:len(data) // 2])
+            self.close_connection = True
+            self.server.stats.record('dropped', time.perf_counter() - started, len(data) // 2)
+            return
+        self.wfile.write(data)
+        self.server.stats.record(status, time.perf_counter() - started, len(data))
+
+    def do_GET(self):
+        started = time.perf_counter()
+        server = self.server
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        chance, jitter = server.roll()
+        delay = server.latency_ms + jitter * server.jitter_ms
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if url.path.rstrip('/') != '/v1/lifelogs':
+            return self.send_json(404, {'error': 'not found'}, started)
+        if not self.headers.get('X-API-Key'):
+            return self.send_json(401, {'error': 'missing API key'}, started)
+        if chance < server.throttle_rate:
+            return self.send_json(429, {'error': 'rate limited'}, started,
+                                  {'Retry-After': str(server.retry_after)})
+        if server.failing and query.get('date') in server.fail_dates:
+            return self.send_json(500, {'error': 'injected failure'}, started)
+
+        logs = server.corpus.select(
+            date=query.get('date'),
+            start=query.get('start'),
+            end=query.get('end'),
+            tz_name=query.get('timezone'),
+            direction=query.get('direction', 'asc')
+        )
+        limit = min(int(query.get('limit', MAX_PAGE_SIZE)), MAX_PAGE_SIZE)
+        offset = int(query.get('cursor') or 0)
+        page = logs[offset:offset + limit]
+        next_cursor = str(offset + limit) if offset + limit < len(logs) else None
+        self.send_json(200, {
+            'data': {'lifelogs': page},
+            'meta': {'lifelogs': {'nextCursor': next_cursor, 'count': len(page)}}
+        }, started, drop=server.drop_rate > 0 and server.roll()[0] < server.drop_rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a synthetic Limitless /lifelogs API locally')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8787)
+    parser.add_argument('--days', type=int, default=30, help='Days of history (default: 30)')
+    parser.add_argument('--lifelogs-per-day', type=int, default=4, help='Conversations per day (default: 4)')
+    parser.add_argument('--segments', type=int, default=60, help='Segments per conversation (default: 60)')
+    parser.add_argument('--timezone', default='America/Los_Angeles', help='Zone the days are laid out in')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Delay before every response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Random +/- spread on the delay')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with each 429')
+    parser.add_argument('--drop-rate', type=float, default=0.0,
+                        help='Fraction of 200 responses cut off half way through the body')
+    args = parser.parse_args()
+
+    corpus = Corpus(args.days, args.lifelogs_per_day, args.segments, timezone=args.timezone)
+    server = MockLimitlessServer(
+        corpus, args.host, args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        throttle_rate=args.throttle_rate, retry_after=args.retry_after, drop_rate=args.drop_rate
+    )
+    print(f"Serving {len(corpus.lifelogs)} lifelogs at {server.url}/lifelogs (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{server.stats.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,48 +4,158 @@ Bulk Import Limitless Data to GitHub
 One-time script to pull ALL historical data from Limitless and organize by date
 """
 
-import os
-import json
 import requests
 from datetime import datetime, timedelta
-from git import Repo
 import time
+import asyncio
+import multiprocessing
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
 import argparse
 
-# Configuration
-LIMITLESS_API_KEY = os.environ.get('LIMITLESS_API_KEY', 'your-api-key-here')
-GITHUB_TOKEN = os.environ.get('GITHUB_TOKEN', 'your-github-token-here')
-GITHUB_USERNAME = os.environ.get('GITHUB_USERNAME', 'HR-AR')
-TIMEZONE = os.environ.get('TIMEZONE', 'America/Los_Angeles')
-REPO_NAME = 'limitless-notes'
-LOCAL_REPO_PATH = os.path.expanduser(f'~/Documents/{REPO_NAME}')
+from limitless_client import LimitlessAPIError, LimitlessClient, bucket_by_date, create_session
+from rate_limit import RetryPolicy, TokenBucket
+from response_cache import ResponseCache
+from rendering import get_renderer, iter_render, move_into_place, note_relpath, render_to_file, write_atomic
+from git_batcher import CommitBatcher
+from odb_writer import FastImportWriter
+from repo_setup import open_repo, restore_from_head, sparse_checkout_dates
+from sync_state import STATE_FILENAME, SyncState
+from timestamps import local_now
+from manifest import MANIFEST_FILENAME, ContentManifest, content_hash
+from search_index import SearchIndex
+from archive import ARCHIVE_AVAILABLE, LifelogArchive
+from journal import COMMITTED, FAILED, FETCHING, JOURNAL_FILENAME, PENDING, RENDERED, Journal
+from metrics import METRICS, count, profiling, span
+from cli_args import add_import_arguments
+from dry_run import plan_import
+# Configuration and defaults (environment variables) live in settings.py
+from settings import (
+    API_URL,
+    DEFAULT_ARCHIVE_DIR,
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CACHE_SIZE_MB,
+    DEFAULT_CLONE_DEPTH,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_RENDER_WORKERS,
+    DEFAULT_RPS,
+    DEFAULT_SEARCH_DB,
+    LIMITLESS_API_KEY,
+    LOCAL_REPO_PATH,
+    REMOTE_URL,
+    TIMEZONE,
+)
+
+# Pipeline markers: a date whose note already exists, one whose content hash is
+# unchanged, and the end of a stage's input
+SKIPPED = object()
+UNCHANGED = object()
+DONE = object()
+
+# Under .git, so rendered temp files never show up in the worktree
+RENDER_DIRNAME = 'limitless-render'
 
 class LimitlessBulkImporter:
-    def __init__(self):
-        self.base_url = "https://api.limitless.ai/v1"
+    def __init__(self, rps=DEFAULT_RPS, max_attempts=5, concurrency=DEFAULT_CONCURRENCY,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 cache_dir=DEFAULT_CACHE_DIR, cache_size_mb=DEFAULT_CACHE_SIZE_MB, offline=False,
+                 output_format='markdown', commit_every_days=None, commit_every_mb=None,
+                 direct_odb=False, update_worktree=True, clone_depth=DEFAULT_CLONE_DEPTH,
+                 partial_clone=True, sparse=True, bare=False, render_workers=DEFAULT_RENDER_WORKERS,
+                 queue_size=DEFAULT_QUEUE_SIZE, force=False, journal_path=None,
+                 search_db=DEFAULT_SEARCH_DB, archive_dir=DEFAULT_ARCHIVE_DIR):
+        self.base_url = API_URL
         self.headers = {
             "X-API-Key": LIMITLESS_API_KEY,
             "Content-Type": "application/json"
         }
+        self.concurrency = concurrency
+        self.render_workers = render_workers
+        self.queue_size = queue_size
+        self.force = force
+        self.output_format = output_format
+        self.extension = get_renderer(output_format).extension
+        # One bucket shared by every request keeps the whole run under the API limit
+        self.rate_limiter = TokenBucket(rps)
+        # One keep-alive pool sized to the workers, reused for every date
+        self.session = create_session(pool_size=concurrency)
+        self.session.headers.update(self.headers)
+        # Raw responses are kept so re-runs revalidate instead of re-downloading
+        self.cache = ResponseCache(cache_dir, cache_size_mb) if cache_dir else None
+        self.client = LimitlessClient(
+            LIMITLESS_API_KEY,
+            self.base_url,
+            timezone=TIMEZONE,
+            rate_limiter=self.rate_limiter,
+            retry_policy=RetryPolicy(max_attempts=max_attempts),
+            session=self.session,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            cache=self.cache,
+            offline=offline
+        )
+        self.clone_depth = clone_depth
+        self.partial_clone = partial_clone
+        self.sparse = sparse
+        self.bare = bare
         self.setup_repo()
+        # Per-date task state survives a killed run; kept in .git so it is never committed
+        self.journal = Journal(journal_path or Path(self.repo.git_dir) / JOURNAL_FILENAME)
+        self.journal.migrate_failed_file(Path(LOCAL_REPO_PATH) / "failed_imports.txt")
+        max_bytes = commit_every_mb * 1024 * 1024 if commit_every_mb else None
+        # Bare clones have no worktree, so they always go straight to the object store
+        self.direct_odb = direct_odb or self.repo.bare
+        if self.direct_odb:
+            # Notes become blobs and commits via fast-import without touching the worktree
+            self.batcher = FastImportWriter(
+                self.repo,
+                max_days=commit_every_days,
+                max_bytes=max_bytes,
+                update_worktree=update_worktree,
+                on_commit=self.mark_committed
+            )
+        else:
+            # Written files are staged in one index update per chunk instead of rescanning the worktree
+            self.batcher = CommitBatcher(
+                self.repo, max_days=commit_every_days, max_bytes=max_bytes, on_commit=self.mark_committed
+            )
+        # Notes are only rewritten when the data they were rendered from changes
+        self.manifest = ContentManifest(LOCAL_REPO_PATH)
+        # Segments of every day written (or confirmed unchanged) are kept searchable
+        self.search_index = SearchIndex(search_db, timezone=TIMEZONE) if search_db else None
+        # ...and archived as typed columns for analytics when pyarrow is installed
+        self.archive = LifelogArchive(archive_dir) if archive_dir and ARCHIVE_AVAILABLE else None
         self.failed_dates = []
         self.successful_dates = []
         
+    def close(self):
+        """Release the journal and search index once the run is over"""
+        self.journal.close()
+        if self.search_index is not None:
+            self.search_index.close()
+    
     def setup_repo(self):
         """Clone or pull the repository"""
-        if not os.path.exists(LOCAL_REPO_PATH):
-            print(f"Cloning repository to {LOCAL_REPO_PATH}")
-            self.repo = Repo.clone_from(
-                f"https://{GITHUB_TOKEN}@github.com/{GITHUB_USERNAME}/{REPO_NAME}.git",
-                LOCAL_REPO_PATH
-            )
-        else:
-            print("Repository already exists, pulling latest changes")
-            self.repo = Repo(LOCAL_REPO_PATH)
-            origin = self.repo.remote('origin')
-            origin.pull()
+        self.repo = open_repo(
+            LOCAL_REPO_PATH,
+            REMOTE_URL,
+            depth=self.clone_depth,
+            partial=self.partial_clone,
+            sparse=self.sparse,
+            bare=self.bare
+        )
+        # No worktree to read the manifest and sync state from
+        restore_from_head(self.repo, [MANIFEST_FILENAME, STATE_FILENAME])
+    
+    def checkout_dates(self, dates):
+        """Widen a sparse checkout to the month directories these dates are written to"""
+        # fast-import never reads the worktree, and read-tree honours the sparse patterns itself
+        if not self.direct_odb:
+            sparse_checkout_dates(self.repo, dates, self.extension)
     
     def get_date_range(self):
         """Get available date range from Limitless API"""
@@ -53,7 +163,7 @@ class LimitlessBulkImporter:
         endpoint = f"{self.base_url}/available_dates"
         
         try:
-            response = requests.get(endpoint, headers=self.headers)
+            response = self.session.get(endpoint, timeout=self.client.timeout)
             if response.status_code == 200:
                 data = response.json()
                 # Assuming API returns first_date and last_date
@@ -63,255 +173,333 @@ class LimitlessBulkImporter:
         
         # Fallback: return last 365 days if can't get range from API
         print("Could not fetch date range from API, defaulting to last 365 days")
-        end_date = datetime.now()
+        end_date = local_now(TIMEZONE)
         start_date = end_date - timedelta(days=365)
         return start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
     
     def fetch_transcript_for_date(self, date_str):
         """Fetch transcript from Limitless API for a specific date"""
-        # Using the lifelogs endpoint that actually works
-        endpoint = f"{self.base_url}/lifelogs"
-
-        # The API returns all lifelogs, so we'll filter by date
-        # For now, just get all lifelogs (since date filtering doesn't seem to work)
-        params = {}
-        
         try:
-            response = requests.get(
-                endpoint,
-                headers=self.headers,
-                params=params,
-                timeout=30
-            )
+            # The API windows by local date server-side, so only this day is downloaded
+            lifelogs = self.client.lifelogs_for_date(date_str)
             
-            if response.status_code == 200:
-                data = response.json()
-                # Check if there's actually data
-                # lifelogs API returns a dict with 'data' -> 'lifelogs' array
-                if data and isinstance(data, dict) and data.get('data', {}).get('lifelogs'):
-                    lifelogs = data['data']['lifelogs']
-                    # Filter for the specific date if needed
-                    # For now, return all data
-                    if len(lifelogs) > 0:
-                        print(f"  Found {len(lifelogs)} lifelog(s) for {date_str}")
-                        return lifelogs
-                    else:
-                        print(f"  No lifelogs found for {date_str}")
-                        return None
-                else:
-                    print(f"  No data available for {date_str}")
-                    return None
-            elif response.status_code == 404:
-                print(f"  No data found for {date_str}")
-                return None
-            elif response.status_code == 429:
-                print(f"  Rate limited on {date_str}, waiting...")
-                time.sleep(60)  # Wait a minute for rate limit
-                return self.fetch_transcript_for_date(date_str)  # Retry
+            if lifelogs:
+                print(f"  Found {len(lifelogs)} lifelog(s) for {date_str}")
+                return lifelogs
             else:
-                print(f"  Error {response.status_code} for {date_str}")
+                print(f"  No lifelogs found for {date_str}")
+                self.journal.fail(date_str, "no lifelogs")
                 return None
                 
+        except LimitlessAPIError as e:
+            # Throttling and server errors were already retried by the client
+            print(f"  Error {e.status_code} for {date_str}")
+            self.journal.fail(date_str, f"HTTP {e.status_code}: {e}")
+            return None
         except requests.exceptions.Timeout:
             print(f"  Timeout for {date_str}")
+            self.journal.fail(date_str, "timeout")
             return None
         except requests.exceptions.RequestException as e:
             print(f"  Error fetching {date_str}: {e}")
+            self.journal.fail(date_str, e)
             return None
     
-    def format_transcript(self, data, date):
-        """Format the transcript data into markdown"""
-        date_obj = datetime.strptime(date, '%Y-%m-%d')
-
-        content = f"""# Daily Notes - {date_obj.strftime('%B %d, %Y')}
-
-**Date**: {date}
-**Day**: {date_obj.strftime('%A')}
-**Import Time**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
----
-
-## Lifelogs
-
-"""
-
-        # Handle Lifelogs data structure
-        if isinstance(data, list):
-            for idx, log in enumerate(data, 1):
-                content += f"\n### Lifelog {idx}\n"
-
-                # Process contents array
-                if log.get('contents') and isinstance(log['contents'], list):
-                    for item in log['contents']:
-                        item_type = item.get('type', '')
-                        item_content = item.get('content', '')
-
-                        if item_type == 'heading1':
-                            content += f"\n# {item_content}\n"
-                        elif item_type == 'heading2':
-                            content += f"\n## {item_content}\n"
-                        elif item_type == 'blockquote':
-                            # Add speaker and time info if available
-                            speaker = item.get('speakerName', 'Unknown')
-                            start_time = item.get('startTime', '')
-                            if start_time:
-                                try:
-                                    st = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                                    time_str = st.strftime('%H:%M:%S')
-                                    content += f"\n**[{time_str}] {speaker}:**\n> {item_content}\n"
-                                except:
-                                    content += f"\n**{speaker}:**\n> {item_content}\n"
-                            else:
-                                content += f"\n**{speaker}:**\n> {item_content}\n"
-                        else:
-                            content += f"\n{item_content}\n"
-
-                content += "\n---\n"
-
-        # Fallback for dict structure
-        elif isinstance(data, dict):
-            # If there are multiple conversations/events
-            if 'conversations' in data:
-                for idx, conversation in enumerate(data['conversations'], 1):
-                    content += f"\n### Conversation {idx}\n"
-                    if 'timestamp' in conversation:
-                        content += f"**Time**: {conversation['timestamp']}\n"
-                    if 'duration' in conversation:
-                        content += f"**Duration**: {conversation['duration']}\n"
-                    if 'participants' in conversation:
-                        content += f"**Participants**: {', '.join(conversation['participants'])}\n"
-                    content += f"\n{conversation.get('text', conversation.get('transcript', ''))}\n\n"
-                    
-                    # Add any tags or topics
-                    if 'tags' in conversation:
-                        content += f"**Tags**: {', '.join(conversation['tags'])}\n\n"
-            
-            # If there are events/activities
-            elif 'events' in data:
-                for idx, event in enumerate(data['events'], 1):
-                    content += f"\n### Event {idx}\n"
-                    content += f"**Type**: {event.get('type', 'Unknown')}\n"
-                    content += f"**Time**: {event.get('timestamp', 'N/A')}\n\n"
-                    content += f"{event.get('description', event.get('text', ''))}\n\n"
-            
-            # If it's a single transcript
-            elif 'transcript' in data:
-                content += data['transcript']
-            
-            # If it has daily summary
-            elif 'daily_summary' in data:
-                content += "### Daily Summary\n\n"
-                content += data['daily_summary']
-                content += "\n\n"
-                
-                # Add any other fields
-                for key, value in data.items():
-                    if key != 'daily_summary' and value:
-                        content += f"### {key.replace('_', ' ').title()}\n\n"
-                        if isinstance(value, (list, dict)):
-                            content += f"```json\n{json.dumps(value, indent=2)}\n```\n\n"
-                        else:
-                            content += f"{value}\n\n"
-            
-            # Fallback: dump everything as JSON
-            else:
-                content += "### Raw Data\n\n"
-                content += "```json\n"
-                content += json.dumps(data, indent=2, default=str)
-                content += "\n```"
-        else:
-            content += str(data)
-        
-        # Add statistics if available
-        if isinstance(data, dict):
-            stats = []
-            if 'word_count' in data:
-                stats.append(f"Words: {data['word_count']}")
-            if 'duration_minutes' in data:
-                stats.append(f"Duration: {data['duration_minutes']} min")
-            if 'conversation_count' in data:
-                stats.append(f"Conversations: {data['conversation_count']}")
-            
-            if stats:
-                content += f"\n---\n\n## Statistics\n\n"
-                content += " | ".join(stats)
-                content += "\n"
+    def fetch_all_lifelogs(self, start_date=None, end_date=None):
+        """Page through every lifelog in the date range once using cursor pagination"""
+        lifelogs = []
+        page = 0
+        params = self.client.build_params(
+            start=start_date,
+            end=f"{end_date} 23:59:59" if end_date else None
+        )
         
-        content += f"""
-
----
-
-## Metadata
-
-- **Source**: Limitless Pendant
-- **Import Type**: Bulk Historical Import
-- **API Version**: v1
-- **Imported**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        while True:
+            try:
+                page_lifelogs, next_cursor = self.client.get_page(params)
+            except LimitlessAPIError as e:
+                print(f"  Error {e.status_code} fetching lifelogs page {page + 1}")
+                return None
+            except requests.exceptions.RequestException as e:
+                print(f"  Error fetching lifelogs page {page + 1}: {e}")
+                return None
+            
+            lifelogs.extend(page_lifelogs)
+            page += 1
+            if not next_cursor:
+                break
+            params["cursor"] = next_cursor
+        
+        print(f"  Fetched {len(lifelogs)} lifelog(s) in {page} page(s)")
+        return lifelogs
 
----
+    def bucket_by_date(self, lifelogs):
+        """Group lifelogs by the local date of their startTime"""
+        return bucket_by_date(lifelogs, TIMEZONE)
 
-*This note was bulk imported from Limitless historical data*
-"""
-        
-        return content
+    def format_transcript(self, data, date):
+        """Format the transcript data into markdown"""
+        return ''.join(iter_render(data, date, self.output_format, timezone=TIMEZONE))
+    
+    def note_path(self, date_str):
+        """Absolute path of the note for a date in the configured output format"""
+        return Path(LOCAL_REPO_PATH) / note_relpath(date_str, self.extension)
     
     def save_file(self, content, date_str):
-        """Save content to file without committing"""
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-        
-        # Create directory structure
-        year = date_obj.strftime('%Y')
-        month = date_obj.strftime('%m-%B')
-        filename = f"{date_str}-notes.md"
-        
-        file_path = Path(LOCAL_REPO_PATH) / year / month / filename
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Write file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        return file_path
+        """Save content (a string or an iterable of chunks) to file without committing"""
+        # Stream to a temp file and rename, so large days never sit in memory
+        if isinstance(content, str):
+            content = [content]
+        return write_atomic(self.note_path(date_str), content)
     
-    def process_single_date(self, date_str):
-        """Process a single date - used for parallel processing"""
-        print(f"Processing {date_str}...")
-        
-        # Check if file already exists
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-        year = date_obj.strftime('%Y')
-        month = date_obj.strftime('%m-%B')
-        filename = f"{date_str}-notes.md"
-        file_path = Path(LOCAL_REPO_PATH) / year / month / filename
-        
-        if file_path.exists():
+    def mark_committed(self, dates):
+        """Batcher callback: these dates are now in a commit"""
+        self.journal.mark(dates, COMMITTED)
+    
+    def keep_existing(self, date_str):
+        """Account for a note that is already on disk, re-queueing it if a killed run never committed it"""
+        if self.journal.state(date_str) == RENDERED and not self.direct_odb:
+            self.batcher.add(self.note_path(date_str), date_str)
+        else:
+            self.journal.mark(date_str, COMMITTED)
+    
+    def stage_manifest(self):
+        """Save the content manifest and queue it with the notes if it changed"""
+        if self.manifest.save():
+            self.batcher.add(self.manifest.path)
+    
+    def note_exists(self, date_str):
+        """Check if the notes file for a date already exists"""
+        if self.direct_odb:
+            return self.batcher.exists(note_relpath(date_str, self.extension))
+        return self.note_path(date_str).exists()
+    
+    def already_imported(self, date_str):
+        """Check if the notes file for a date already exists, recording it as done"""
+        if self.note_exists(date_str):
             print(f"  Skipping {date_str} - already exists")
+            self.keep_existing(date_str)
             self.successful_dates.append(date_str)
             return True
+        return False
+    
+    def fetch_date(self, date_str):
+        """
+        Fetch stage of the pipeline: returns (lifelogs or a marker, content hash, lifelogs)
         
-        # Fetch data
-        data = self.fetch_transcript_for_date(date_str)
-        
+        SKIPPED if the note exists and force is off; UNCHANGED if it was
+        re-fetched but hashes the same as the data it was written from.
+        """
+        print(f"Processing {date_str}...")
+        exists = self.note_exists(date_str)
+        if exists and not self.force:
+            return SKIPPED, None, None
+        self.journal.start(date_str)
+        with span('fetch_date', date=date_str):
+            data = self.fetch_transcript_for_date(date_str)
+        if not data:
+            return data, None, None
+        digest = content_hash(data)
+        if exists and self.manifest.unchanged(note_relpath(date_str, self.extension), digest):
+            return UNCHANGED, digest, data
+        return data, digest, data
+    
+    def write_rendered(self, date_str, content, digest=None):
+        """Write a rendered note (a string or chunks) and queue it for the next commit"""
+        # Recorded before queueing, since queueing may commit and mark the date committed
+        self.journal.mark(date_str, RENDERED)
+        if self.direct_odb:
+            rel_path = note_relpath(date_str, self.extension)
+            self.batcher.write_note(rel_path, content, date_str)
+        else:
+            rel_path = self.save_file(content, date_str).relative_to(LOCAL_REPO_PATH)
+            self.batcher.add(rel_path, date_str)
+        if digest:
+            self.manifest.record(rel_path, digest)
+        print(f"  ✓ Saved {date_str} to {rel_path}")
+    
+    def write_rendered_file(self, date_str, tmp_path, digest=None):
+        """Move a note the pipeline rendered into a temp file into place and queue it for the next commit"""
+        self.journal.mark(date_str, RENDERED)
+        rel_path = note_relpath(date_str, self.extension)
+        try:
+            if self.direct_odb:
+                self.batcher.write_file(rel_path, tmp_path, date_str)
+            else:
+                move_into_place(tmp_path, self.note_path(date_str))
+                self.batcher.add(rel_path, date_str)
+        finally:
+            Path(tmp_path).unlink(missing_ok=True)
+        if digest:
+            self.manifest.record(rel_path, digest)
+        print(f"  ✓ Saved {date_str} to {rel_path}")
+    
+    def export_day(self, date_str, lifelogs, digest=None):
+        """Bring the search index and archive up to date for one day (each skips an unchanged hash)"""
+        if not lifelogs:
+            return
+        if self.search_index is not None:
+            with span('search_index', date=date_str):
+                self.search_index.index_day(date_str, lifelogs, digest)
+        if self.archive is not None:
+            with span('archive', date=date_str):
+                self.archive.append_day(date_str, lifelogs, digest)
+    
+    def remove_date(self, date_str):
+        """Delete the note for a day whose lifelogs were all deleted upstream"""
+        print(f"No lifelogs left for {date_str}; removing its notes")
+        if self.search_index is not None:
+            self.search_index.index_day(date_str, [])
+        if self.archive is not None:
+            self.archive.append_day(date_str, [])
+        self.manifest.forget(note_relpath(date_str, self.extension))
+        self.batcher.remove(self.note_path(date_str), date_str)
+    
+    def save_date(self, date_str, data):
+        """Format and save already-fetched data for a single date, unless its content is unchanged"""
         if data:
-            # Format and save
-            content = self.format_transcript(data, date_str)
-            saved_path = self.save_file(content, date_str)
-            print(f"  ✓ Saved {date_str} to {saved_path.relative_to(LOCAL_REPO_PATH)}")
+            digest = content_hash(data)
+            if self.manifest.unchanged(note_relpath(date_str, self.extension), digest) and self.note_exists(date_str):
+                print(f"  = {date_str} unchanged")
+                self.keep_existing(date_str)
+            else:
+                self.write_rendered(date_str, iter_render(data, date_str, self.output_format, timezone=TIMEZONE), digest)
+            self.export_day(date_str, data, digest)
             self.successful_dates.append(date_str)
             return True
         else:
+            self.journal.fail(date_str, "no lifelogs")
             self.failed_dates.append(date_str)
             return False
     
-    def bulk_import(self, start_date=None, end_date=None, parallel=True, max_workers=3):
+    async def run_dates(self, dates, concurrency=None, render_workers=None, queue_size=None):
+        """
+        Process dates through a staged pipeline
+        
+        fetch (`concurrency` threads) -> bounded queue -> render
+        (`render_workers` processes, 0 to render on the writer thread) ->
+        bounded queue -> a single writer that saves, stages and records every
+        result. A full queue holds back the stage feeding it, and only the
+        writer touches the successful/failed lists. Request pacing comes from
+        the shared token bucket. If a stage task itself dies, the others are
+        cancelled and its error is raised instead of leaving them blocked.
+        
+        Notes are rendered into temp files under .git/limitless-render and
+        only their paths are passed on, so neither the render workers nor
+        the writer hold a whole rendered day in memory.
+        """
+        concurrency = concurrency or self.concurrency
+        render_workers = self.render_workers if render_workers is None else render_workers
+        queue_size = queue_size or self.queue_size
+        loop = asyncio.get_running_loop()
+        total = len(dates)
+        if not total:
+            return
+        
+        render_dir = Path(self.repo.git_dir) / RENDER_DIRNAME
+        render_dir.mkdir(exist_ok=True)
+        # Left behind by a run that was killed between render and write
+        for stale in render_dir.glob('*.tmp'):
+            stale.unlink()
+        
+        pending = asyncio.Queue()
+        for date in dates:
+            pending.put_nowait(date)
+        fetched = asyncio.Queue(maxsize=queue_size)
+        rendered = asyncio.Queue(maxsize=queue_size)
+        
+        async def fetch_stage(pool):
+            while not pending.empty():
+                date = pending.get_nowait()
+                try:
+                    data, digest, lifelogs = await loop.run_in_executor(pool, self.fetch_date, date)
+                except Exception as e:
+                    print(f"  ✗ Error fetching {date}: {e}")
+                    self.journal.fail(date, e)
+                    data, digest, lifelogs = None, None, None
+                await fetched.put((date, data, digest, lifelogs))
+        
+        async def render_stage(pool):
+            while (item := await fetched.get()) is not DONE:
+                date, data, digest, lifelogs = item
+                if data and data is not SKIPPED and data is not UNCHANGED:
+                    try:
+                        with span('render', date=date):
+                            data = await loop.run_in_executor(
+                                pool, render_to_file, data, date, str(render_dir),
+                                self.output_format, 'import', None, TIMEZONE
+                            )
+                    except Exception as e:
+                        print(f"  ✗ Error rendering {date}: {e}")
+                        self.journal.fail(date, e)
+                        data = None
+                await rendered.put((date, data, digest, lifelogs))
+        
+        async def write_stage(pool):
+            for completed in range(1, total + 1):
+                date, content, digest, lifelogs = await rendered.get()
+                if content:
+                    try:
+                        if content is SKIPPED:
+                            print(f"  Skipping {date} - already exists")
+                            await loop.run_in_executor(pool, self.keep_existing, date)
+                        elif content is UNCHANGED:
+                            print(f"  = {date} unchanged")
+                            await loop.run_in_executor(pool, self.keep_existing, date)
+                        else:
+                            await loop.run_in_executor(pool, self.write_rendered_file, date, content, digest)
+                        await loop.run_in_executor(pool, self.export_day, date, lifelogs, digest)
+                        self.successful_dates.append(date)
+                    except Exception as e:
+                        print(f"  ✗ Error saving {date}: {e}")
+                        self.journal.fail(date, e)
+                        self.failed_dates.append(date)
+                else:
+                    self.failed_dates.append(date)
+                print(f"Progress: {completed}/{total} ({completed*100//total}%)")
+        
+        # requests is blocking, so each in-flight fetch gets its own thread
+        fetch_pool = ThreadPoolExecutor(max_workers=concurrency)
+        write_pool = ThreadPoolExecutor(max_workers=1)
+        # spawn keeps workers from inheriting open git pipes and the fetch threads
+        render_pool = ProcessPoolExecutor(
+            max_workers=render_workers,
+            mp_context=multiprocessing.get_context('spawn')
+        ) if render_workers else write_pool
+        try:
+            fetchers = [asyncio.create_task(fetch_stage(fetch_pool)) for _ in range(min(concurrency, total))]
+            renderers = [asyncio.create_task(render_stage(render_pool)) for _ in range(max(render_workers, 1))]
+            
+            async def close_fetched():
+                await asyncio.gather(*fetchers)
+                for _ in renderers:
+                    await fetched.put(DONE)
+            
+            stages = [*fetchers, *renderers, asyncio.create_task(close_fetched()),
+                      asyncio.create_task(write_stage(write_pool))]
+            done, running = await asyncio.wait(stages, return_when=asyncio.FIRST_EXCEPTION)
+            if running:
+                # A stage died; the others would block forever on the queues it no longer serves
+                for task in running:
+                    task.cancel()
+                await asyncio.wait(running)
+            for task in done:
+                task.result()
+        finally:
+            for pool in {fetch_pool, render_pool, write_pool}:
+                pool.shutdown()
+    
+    def bulk_import(self, start_date=None, end_date=None, parallel=True,
+                    concurrency=None, single_pass=False):
         """
         Perform bulk import of historical data
         
         Args:
             start_date: Start date (YYYY-MM-DD) or None for API default
             end_date: End date (YYYY-MM-DD) or None for today
-            parallel: Use parallel processing
-            max_workers: Number of parallel workers (be conservative to avoid rate limits)
+            parallel: Use concurrent requests (False is the same as concurrency=1)
+            concurrency: Maximum number of requests in flight (default: pool size)
+            single_pass: Fetch all lifelogs once and split them by date locally
         """
         print("\n" + "="*60)
         print("LIMITLESS BULK IMPORT STARTING")
@@ -333,50 +521,47 @@ class LimitlessBulkImporter:
             dates_to_process.append(current.strftime('%Y-%m-%d'))
             current += timedelta(days=1)
         
+        # Dates a previous (possibly killed) run already committed are not touched again
+        self.journal.enqueue(dates_to_process)
+        done = []
+        if not self.force:
+            committed = set(self.journal.dates(COMMITTED))
+            done = [date for date in dates_to_process if date in committed]
+            dates_to_process = [date for date in dates_to_process if date not in committed]
+            self.successful_dates.extend(done)
+        
         total_days = len(dates_to_process)
         print(f"\nDate Range: {start_date} to {end_date}")
+        if done:
+            print(f"Already Committed: {len(done)} days (from the import journal)")
         print(f"Total Days to Process: {total_days}")
-        print(f"Processing Mode: {'Parallel' if parallel else 'Sequential'}")
-        if parallel:
-            print(f"Workers: {max_workers}")
+        concurrency = concurrency or self.concurrency
+        if not parallel:
+            concurrency = 1
+        if single_pass:
+            print("Processing Mode: Single pass")
+        else:
+            print(f"Processing Mode: {'Parallel' if concurrency > 1 else 'Sequential'}")
+            print(f"Concurrency: {concurrency}")
+            print(f"Render Workers: {self.render_workers or 'writer thread'}")
+        print(f"Rate Limit: {self.rate_limiter.rate or 'unlimited'} requests/sec")
         print("\n" + "-"*60 + "\n")
         
+        self.checkout_dates(dates_to_process)
         start_time = time.time()
         
-        if parallel and total_days > 5:
-            # Parallel processing for large imports
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {
-                    executor.submit(self.process_single_date, date): date 
-                    for date in dates_to_process
-                }
-                
-                completed = 0
-                for future in as_completed(futures):
-                    completed += 1
-                    date = futures[future]
-                    try:
-                        success = future.result()
-                        print(f"Progress: {completed}/{total_days} ({completed*100//total_days}%)")
-                    except Exception as e:
-                        print(f"  ✗ Error processing {date}: {e}")
-                        self.failed_dates.append(date)
-                    
-                    # Small delay between requests to be nice to the API
-                    if completed % 10 == 0:
-                        time.sleep(1)
-        else:
-            # Sequential processing
+        if single_pass:
+            # One paginated download of the whole corpus, bucketed by local date
+            lifelogs = self.fetch_all_lifelogs(start_date, end_date)
+            buckets = self.bucket_by_date(lifelogs) if lifelogs is not None else {}
+            
             for idx, date in enumerate(dates_to_process, 1):
-                self.process_single_date(date)
+                print(f"Processing {date}...")
+                if self.force or not self.already_imported(date):
+                    self.save_date(date, buckets.get(date))
                 print(f"Progress: {idx}/{total_days} ({idx*100//total_days}%)")
-                
-                # Rate limiting - adjust based on API limits
-                if idx % 10 == 0:
-                    print("  Pausing for rate limit...")
-                    time.sleep(2)
-                else:
-                    time.sleep(0.5)  # Small delay between requests
+        else:
+            asyncio.run(self.run_dates(dates_to_process, concurrency))
         
         elapsed = time.time() - start_time
         
@@ -384,31 +569,15 @@ class LimitlessBulkImporter:
         print("\n" + "-"*60)
         print("Committing all changes to Git...")
         
-        try:
-            # Add all new files
-            self.repo.git.add(A=True)
-            
-            # Check if there are changes
-            if self.repo.index.diff("HEAD"):
-                # Commit with summary
-                commit_msg = f"""Bulk import of Limitless data
+        commit_msg = f"""Bulk import of Limitless data
 
 Imported: {len(self.successful_dates)} days
 Failed: {len(self.failed_dates)} days
 Date Range: {start_date} to {end_date}
 Duration: {elapsed:.1f} seconds
 """
-                self.repo.index.commit(commit_msg)
-                
-                # Push to GitHub
-                print("Pushing to GitHub...")
-                origin = self.repo.remote('origin')
-                origin.push()
-                print("✓ Successfully pushed to GitHub")
-            else:
-                print("No new changes to commit")
-        except Exception as e:
-            print(f"Git error: {e}")
+        self.stage_manifest()
+        self.batcher.finish(commit_msg)
         
         # Print summary
         print("\n" + "="*60)
@@ -419,98 +588,197 @@ Duration: {elapsed:.1f} seconds
         print(f"⏱ Time elapsed: {elapsed:.1f} seconds")
         print(f"📁 Repository: {LOCAL_REPO_PATH}")
         
-        # Save failed dates for retry
+        # Failures (with their errors) are already in the journal
         if self.failed_dates:
-            failed_file = Path(LOCAL_REPO_PATH) / "failed_imports.txt"
-            with open(failed_file, 'w') as f:
-                f.write('\n'.join(self.failed_dates))
-            print(f"\nFailed dates saved to: {failed_file}")
-            print("You can retry these specific dates later")
+            print(f"\nFailed dates are recorded in the import journal: {self.journal.path}")
+            print("Retry them with --retry-failed")
         
         return len(self.successful_dates), len(self.failed_dates)
     
-    def retry_failed(self):
-        """Retry previously failed imports"""
-        failed_file = Path(LOCAL_REPO_PATH) / "failed_imports.txt"
-        if not failed_file.exists():
-            print("No failed imports to retry")
-            return
-        
-        with open(failed_file, 'r') as f:
-            dates = f.read().strip().split('\n')
+    def incremental_sync(self, lookback_days=1):
+        """
+        Fetch only lifelogs newer than the last sync and rewrite only the days they touch
         
-        print(f"Retrying {len(dates)} failed imports...")
-        self.failed_dates = []
+        Progress is tracked in .sync_state.json inside the notes repository.
+        """
+        print(f"\n=== Starting incremental sync at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
+        state = SyncState(LOCAL_REPO_PATH)
+        start_date = state.window_start(lookback_days, TIMEZONE)
+        end_date = local_now(TIMEZONE).strftime('%Y-%m-%d')
+        print(f"Window: {start_date} to {end_date}")
+        
+        lifelogs = self.fetch_all_lifelogs(start_date, end_date)
+        if lifelogs is None:
+            print("Could not fetch lifelogs, state left unchanged")
+            return 0
+        
+        buckets = self.bucket_by_date(lifelogs)
+        changed = state.changed_days(buckets, start_date, end_date)
+        if not changed:
+            print("No new or changed lifelogs")
+            print("=== Sync complete ===\n")
+            return 0
+        
+        self.checkout_dates(changed)
+        for date in changed:
+            if date not in buckets:
+                self.remove_date(date)
+                state.forget(date)
+                continue
+            print(f"Updating {date}...")
+            if self.save_date(date, buckets[date]):
+                state.record(date, buckets[date])
+        state.save()
+        self.batcher.add(state.path)
+        self.stage_manifest()
+        
+        self.batcher.finish(f"Sync {len(changed)} day(s) of Limitless notes\n\nDays: {', '.join(changed)}\n")
+        print("=== Sync complete ===\n")
+        return len(changed)
+    
+    def retry_failed(self, concurrency=None, rounds=3):
+        """
+        Retry every failed date from the journal concurrently
         
-        for date in dates:
-            self.process_single_date(date)
-            time.sleep(1)  # Rate limiting
+        Dates that fail again are retried for up to `rounds` rounds, with a
+        jittered exponential pause between rounds.
+        """
+        dates = self.journal.dates(FAILED)
+        if not dates:
+            print("No failed imports to retry")
+            return
         
-        # Update failed file
-        if self.failed_dates:
-            with open(failed_file, 'w') as f:
-                f.write('\n'.join(self.failed_dates))
+        backoff = RetryPolicy(base_delay=2.0)
+        retried = len(dates)
+        self.checkout_dates(dates)
+        for attempt in range(1, rounds + 1):
+            if attempt > 1:
+                delay = backoff.backoff(attempt)
+                print(f"Waiting {delay:.1f}s before retrying {len(dates)} date(s)...")
+                time.sleep(delay)
+            print(f"Retrying {len(dates)} failed imports (round {attempt}/{rounds})...")
+            self.failed_dates = []
+            asyncio.run(self.run_dates(dates, concurrency))
+            dates = sorted(self.failed_dates)
+            if not dates:
+                break
+        
+        self.stage_manifest()
+        self.batcher.finish(f"Retry {retried} failed Limitless import(s)")
+        
+        if dates:
+            print(f"\n{len(dates)} date(s) still failing:")
+            for date, attempts, error in self.journal.failures():
+                if date in dates:
+                    print(f"  {date}: {error} ({attempts} attempt(s))")
         else:
-            failed_file.unlink()
             print("All retries successful!")
+    
+    def resume(self, concurrency=None):
+        """Finish the dates an interrupted run left pending, in flight or uncommitted"""
+        dates = self.journal.dates(PENDING, FETCHING, RENDERED)
+        if not dates:
+            print("Nothing to resume")
+            return
+        
+        print(f"Resuming {len(dates)} unfinished date(s) from the import journal...")
+        self.checkout_dates(dates)
+        asyncio.run(self.run_dates(dates, concurrency))
+        self.stage_manifest()
+        if not self.direct_odb and self.manifest.path.exists():
+            # The interrupted run may have saved the manifest without committing it
+            self.batcher.add(self.manifest.path)
+        self.batcher.finish(f"Resume Limitless import of {len(dates)} day(s)")
+        print(f"✓ {len(self.successful_dates)} done, ✗ {len(self.failed_dates)} failed")
 
 def main():
     parser = argparse.ArgumentParser(description='Bulk import Limitless data to GitHub')
-    parser.add_argument(
-        '--start-date', 
-        type=str, 
-        help='Start date (YYYY-MM-DD). Default: API earliest or 1 year ago'
-    )
-    parser.add_argument(
-        '--end-date', 
-        type=str,
-        default=datetime.now().strftime('%Y-%m-%d'),
-        help='End date (YYYY-MM-DD). Default: today'
-    )
-    parser.add_argument(
-        '--days-back',
-        type=int,
-        help='Alternative: Import last N days'
-    )
-    parser.add_argument(
-        '--sequential',
-        action='store_true',
-        help='Use sequential processing instead of parallel'
-    )
-    parser.add_argument(
-        '--workers',
-        type=int,
-        default=3,
-        help='Number of parallel workers (default: 3)'
-    )
-    parser.add_argument(
-        '--retry-failed',
-        action='store_true',
-        help='Retry previously failed imports'
+    # Shared with `limitless_sync.py import`
+    add_import_arguments(parser)
+    execute(parser.parse_args())
+
+
+def execute(args):
+    """Run an import from parsed arguments, writing metrics (and a profile) around it"""
+    if args.dry_run:
+        plan_import(args)
+        return
+    # Each mode gets its own log and textfile, so a cron'd --incremental never hides a backfill
+    mode = (
+        'retry_failed' if args.retry_failed else
+        'resume' if args.resume else
+        'incremental_sync' if args.incremental else
+        'bulk_import'
     )
+    if not args.no_metrics:
+        METRICS.configure(mode, args.metrics_dir)
     
-    args = parser.parse_args()
-    
+    success = False
+    try:
+        with profiling(args.profile, mode) if args.profile else nullcontext():
+            run(args)
+        success = True
+    finally:
+        METRICS.finish(success)
+
+
+def run(args):
+    """Build the importer from parsed arguments and run the requested mode"""
     # Initialize importer
-    importer = LimitlessBulkImporter()
+    concurrency = 1 if args.sequential else args.concurrency
+    importer = LimitlessBulkImporter(
+        rps=args.rps,
+        max_attempts=args.max_attempts,
+        concurrency=concurrency,
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        cache_size_mb=args.cache_size_mb,
+        offline=args.offline,
+        output_format=args.format,
+        commit_every_days=args.commit_every_days,
+        commit_every_mb=args.commit_every_mb,
+        direct_odb=args.direct_odb,
+        update_worktree=not args.no_worktree,
+        clone_depth=args.clone_depth,
+        partial_clone=not args.full_clone,
+        sparse=not args.full_clone,
+        bare=args.bare,
+        render_workers=args.render_workers,
+        queue_size=args.queue_size,
+        force=args.force,
+        journal_path=args.journal,
+        search_db=None if args.no_index else args.search_db,
+        archive_dir=None if args.no_archive else args.archive_dir
+    )
     
-    if args.retry_failed:
-        importer.retry_failed()
-    else:
-        # Determine date range
-        if args.days_back:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=args.days_back)
-            args.start_date = start_date.strftime('%Y-%m-%d')
-            args.end_date = end_date.strftime('%Y-%m-%d')
-        
-        # Run bulk import
-        importer.bulk_import(
-            start_date=args.start_date,
-            end_date=args.end_date,
-            parallel=not args.sequential,
-            max_workers=args.workers
-        )
+    try:
+        if args.retry_failed:
+            importer.retry_failed(concurrency=concurrency)
+        elif args.resume:
+            importer.resume(concurrency=concurrency)
+        elif args.incremental:
+            importer.incremental_sync(lookback_days=args.lookback_days)
+        else:
+            # Determine date range
+            if args.days_back:
+                end_date = local_now(TIMEZONE)
+                start_date = end_date - timedelta(days=args.days_back)
+                args.start_date = start_date.strftime('%Y-%m-%d')
+                args.end_date = end_date.strftime('%Y-%m-%d')
+            
+            # Run bulk import
+            importer.bulk_import(
+                start_date=args.start_date,
+                end_date=args.end_date,
+                concurrency=concurrency,
+                single_pass=args.single_pass
+            )
+    finally:
+        importer.close()
+    
+    count('dates', len(importer.successful_dates), outcome='succeeded')
+    count('dates', len(importer.failed_dates), outcome='failed')
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,307 @@
+"""
+Command Line Arguments
+The option definitions shared by limitless_sync.py and the scripts it wraps
+(bulk_import_limitless.py, limitless_to_github.py, search_index.py and
+archive.py), so every entry point accepts the same options
+
+Only the standard library and settings.py (plus the light journal,
+rendering and timestamps modules) are imported, so building a parser stays
+cheap.
+"""
+
+import os
+
+from settings import (
+    DEFAULT_ARCHIVE_DIR,
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CACHE_SIZE_MB,
+    DEFAULT_CLONE_DEPTH,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_INTERVAL_MINUTES,
+    DEFAULT_JITTER_SECONDS,
+    DEFAULT_METRICS_DIR,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_RENDER_WORKERS,
+    DEFAULT_RPS,
+    DEFAULT_SEARCH_DB,
+    TIMEZONE,
+)
+# Both light: the renderers only pull in the standard library until a note is rendered
+from journal import JOURNAL_FILENAME
+from rendering import RENDERERS
+from timestamps import local_now
+
+
+def add_range_arguments(parser):
+    """Which days an import covers"""
+    parser.add_argument(
+        '--start-date', 
+        type=str, 
+        help='Start date (YYYY-MM-DD). Default: API earliest or 1 year ago'
+    )
+    parser.add_argument(
+        '--end-date', 
+        type=str,
+        default=local_now(TIMEZONE).strftime('%Y-%m-%d'),
+        help='End date (YYYY-MM-DD). Default: today in the configured timezone'
+    )
+    parser.add_argument(
+        '--days-back',
+        type=int,
+        help='Alternative: Import last N days'
+    )
+    parser.add_argument(
+        '--single-pass',
+        action='store_true',
+        help='Download all lifelogs once and split them by date locally'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only fetch lifelogs newer than the last sync (tracked in .sync_state.json)'
+    )
+    parser.add_argument(
+        '--lookback-days',
+        type=int,
+        default=1,
+        help='Days before the last synced day to re-check in incremental mode (default: 1)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-fetch days that already have a note and rewrite those whose content changed'
+    )
+
+def add_mode_arguments(parser):
+    """The importer's alternative modes (bulk_import_limitless.py spells them as flags)"""
+    parser.add_argument(
+        '--retry-failed',
+        action='store_true',
+        help='Retry every failed date in the import journal concurrently'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Finish the dates an interrupted import left pending or uncommitted'
+    )
+
+def add_importer_arguments(parser):
+    """How the importer fetches, renders, commits and indexes"""
+    parser.add_argument(
+        '--sequential',
+        action='store_true',
+        help='Use sequential processing instead of parallel'
+    )
+    parser.add_argument(
+        '--concurrency', '--workers',
+        dest='concurrency',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f'Maximum requests in flight (default: {DEFAULT_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--render-workers',
+        type=int,
+        default=DEFAULT_RENDER_WORKERS,
+        help=f'Processes rendering notes, 0 to render on the writer thread (default: {DEFAULT_RENDER_WORKERS})'
+    )
+    parser.add_argument(
+        '--queue-size',
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f'Days buffered between pipeline stages (default: {DEFAULT_QUEUE_SIZE})'
+    )
+    parser.add_argument(
+        '--rps',
+        type=float,
+        default=DEFAULT_RPS,
+        help=f'Requests per second across all workers, 0 for unlimited (default: {DEFAULT_RPS:g})'
+    )
+    parser.add_argument(
+        '--format',
+        choices=sorted(RENDERERS),
+        default='markdown',
+        help='Output format for the daily files (default: markdown)'
+    )
+    parser.add_argument(
+        '--commit-every-days',
+        type=int,
+        help='Commit after this many days have been written (default: one commit per run)'
+    )
+    parser.add_argument(
+        '--commit-every-mb',
+        type=int,
+        help='Commit after this many megabytes of notes have been written'
+    )
+    parser.add_argument(
+        '--direct-odb',
+        action='store_true',
+        help='Write notes straight into the git object store with fast-import (implied for bare clones)'
+    )
+    parser.add_argument(
+        '--no-worktree',
+        action='store_true',
+        help='With --direct-odb, leave the worktree and index untouched after committing'
+    )
+    parser.add_argument(
+        '--clone-depth',
+        type=int,
+        default=DEFAULT_CLONE_DEPTH,
+        help=f'Commits of history for a fresh clone, 0 for all (default: {DEFAULT_CLONE_DEPTH})'
+    )
+    parser.add_argument(
+        '--bare',
+        action='store_true',
+        help='Clone the notes repository without a worktree; notes are written with fast-import'
+    )
+    parser.add_argument(
+        '--full-clone',
+        action='store_true',
+        help='Clone every file and check out the whole tree instead of a blob-less sparse clone'
+    )
+    parser.add_argument(
+        '--search-db',
+        type=str,
+        default=DEFAULT_SEARCH_DB,
+        help=f'Full-text search index updated as days are written (default: {DEFAULT_SEARCH_DB})'
+    )
+    parser.add_argument(
+        '--no-index',
+        action='store_true',
+        help='Do not update the search index'
+    )
+    parser.add_argument(
+        '--archive-dir',
+        type=str,
+        default=DEFAULT_ARCHIVE_DIR,
+        help=f'Arrow archive of raw segments, written when pyarrow is installed (default: {DEFAULT_ARCHIVE_DIR})'
+    )
+    parser.add_argument(
+        '--no-archive',
+        action='store_true',
+        help='Do not update the Arrow archive'
+    )
+    parser.add_argument(
+        '--journal',
+        type=str,
+        help=f'Import journal database (default: .git/{JOURNAL_FILENAME} in the notes repository)'
+    )
+    parser.add_argument(
+        '--max-attempts',
+        type=int,
+        default=5,
+        help='Attempts per request before giving up on throttling/server errors (default: 5)'
+    )
+    parser.add_argument(
+        '--connect-timeout',
+        type=float,
+        default=DEFAULT_CONNECT_TIMEOUT,
+        help=f'Seconds to wait for a connection (default: {DEFAULT_CONNECT_TIMEOUT})'
+    )
+    parser.add_argument(
+        '--read-timeout',
+        type=float,
+        default=DEFAULT_READ_TIMEOUT,
+        help=f'Seconds to wait for a response (default: {DEFAULT_READ_TIMEOUT})'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help=f'Directory for the raw response cache (default: {DEFAULT_CACHE_DIR})'
+    )
+    parser.add_argument(
+        '--cache-size-mb',
+        type=int,
+        default=DEFAULT_CACHE_SIZE_MB,
+        help=f'Evict least recently used responses above this size (default: {DEFAULT_CACHE_SIZE_MB})'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Disable the raw response cache'
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Serve only from the response cache without contacting the API'
+    )
+
+def add_metrics_arguments(parser):
+    """Where the span log and Prometheus textfile go, shared by the importer and the sync"""
+    parser.add_argument(
+        '--metrics-dir',
+        default=DEFAULT_METRICS_DIR,
+        help=f'Where the JSON-lines span log and Prometheus textfile go (default: {DEFAULT_METRICS_DIR})'
+    )
+    parser.add_argument(
+        '--no-metrics',
+        action='store_true',
+        help='Do not write the span log or the Prometheus textfile'
+    )
+
+
+def add_run_arguments(parser):
+    """Metrics, profiling and --dry-run, shared by every importer mode"""
+    add_metrics_arguments(parser)
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const=os.path.join(DEFAULT_METRICS_DIR, 'profiles'),
+        metavar='DIR',
+        help='Run under cProfile and tracemalloc and write the reports to DIR (default: <metrics dir>/profiles)'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Print what would be fetched and written, from local state only, and exit'
+    )
+
+
+def add_import_arguments(parser):
+    """Every option of bulk_import_limitless.py"""
+    add_range_arguments(parser)
+    add_mode_arguments(parser)
+    add_importer_arguments(parser)
+    add_run_arguments(parser)
+
+
+def add_sync_arguments(parser):
+    """Options of the daily sync (limitless_to_github.py)"""
+    parser.add_argument('--once', action='store_true', help='Sync once and exit instead of staying resident')
+    parser.add_argument('--historical', type=int, nargs='?', const=30, metavar='DAYS',
+                        help='Re-sync the last DAYS days (default: 30) and exit')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL_MINUTES,
+                        help=f'Minutes between syncs (default: {DEFAULT_INTERVAL_MINUTES:g})')
+    parser.add_argument('--jitter', type=float, default=DEFAULT_JITTER_SECONDS,
+                        help=f'Random +/- seconds added to each interval (default: {DEFAULT_JITTER_SECONDS:g})')
+    parser.add_argument('--accounts', metavar='FILE', help='Sync every account in this JSON file (see accounts.template.json)')
+    parser.add_argument('--concurrency', type=int, help='With --accounts, accounts synced at a time (default: from the file)')
+    add_metrics_arguments(parser)
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const=os.path.join(DEFAULT_METRICS_DIR, 'profiles'),
+        metavar='DIR',
+        help='Write cProfile/tracemalloc reports for each sync to DIR (default: <metrics dir>/profiles)'
+    )
+    parser.add_argument('--dry-run', action='store_true', help='Print what would be synced, from local state only, and exit')
+
+
+def add_search_arguments(parser):
+    """Query options of search_index.py search"""
+    parser.add_argument('query', help='Words to search for')
+    parser.add_argument('--since', help='Only days on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--until', help='Only days on or before this date (YYYY-MM-DD)')
+    parser.add_argument('--speaker', help='Only segments from this speaker')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum results (default: 20)')
+    parser.add_argument('--raw', action='store_true', help='Pass the query to FTS5 unquoted (OR, NEAR, prefix*)')
+
+
+def add_stats_arguments(parser):
+    """Options of archive.py stats"""
+    parser.add_argument('--since', help='First day (YYYY-MM-DD)')
+    parser.add_argument('--until', help='Last day (YYYY-MM-DD)')
+    parser.add_argument('--speakers', action='store_true', help='Show the speaker breakdown only')
@@ -10,16 +10,16 @@ source .env
 # Activate virtual environment
 source limitless-env/bin/activate
 
-# Get yesterday's date (most recent complete day)
-YESTERDAY=$(date -v-1d +%Y-%m-%d 2>/dev/null || date -d "yesterday" +%Y-%m-%d)
-
 # Log file
 LOG_FILE="sync_log.txt"
 
-echo "$(date): Starting sync for $YESTERDAY" >> $LOG_FILE
+echo "$(date): Starting incremental sync" >> $LOG_FILE
 
-# Run the sync
-python3 bulk_import_limitless.py --start-date $YESTERDAY --end-date $YESTERDAY >> $LOG_FILE 2>&1
+# Run the sync - only lifelogs newer than .sync_state.json are fetched,
+# so this is cheap enough to run hourly or every 15 minutes
+# Stage timings are also logged as JSON lines and a Prometheus textfile
+# (~/.cache/limitless-sync/metrics/limitless_incremental_sync.prom)
+python3 bulk_import_limitless.py --incremental >> $LOG_FILE 2>&1
 
 echo "$(date): Sync completed" >> $LOG_FILE
 echo "---" >> $LOG_FILE
\ No newline at end of file
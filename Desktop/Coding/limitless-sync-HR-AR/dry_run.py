@@ -0,0 +1,208 @@
+"""
+Dry Runs
+Plans for --dry-run: what an import, retry, resume or sync would fetch and
+write, worked out from local state alone
+
+Reads the import journal, the notes committed at HEAD and .sync_state.json;
+nothing is fetched, cloned, pulled or written, and none of requests,
+GitPython, NumPy or pyarrow is imported.
+"""
+
+import re
+import subprocess
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from journal import JOURNAL_FILENAME
+from rendering import RENDERERS
+from settings import DEFAULT_RPS, LOCAL_REPO_PATH, REMOTE_URL, TIMEZONE
+from timestamps import local_now
+
+
+def redact(url):
+    """A remote URL without the credentials embedded in it"""
+    return re.sub(r'//[^/@]+@', '//***@', url)
+
+
+def date_ranges(dates):
+    """Collapse sorted YYYY-MM-DD strings into 'first..last' runs of consecutive days"""
+    runs = []
+    for date_str in dates:
+        day = datetime.strptime(date_str, '%Y-%m-%d')
+        if runs and day - runs[-1][1] == timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return ', '.join(
+        first.strftime('%Y-%m-%d') if first == last else f"{first:%Y-%m-%d}..{last:%Y-%m-%d}"
+        for first, last in runs
+    )
+
+
+def git_dir(repo_path):
+    """The repository's git directory (the clone itself when bare), or None if there is no clone"""
+    repo = Path(repo_path)
+    if (repo / '.git').is_dir():
+        return repo / '.git'
+    if (repo / 'HEAD').is_file():
+        return repo
+    return None
+
+
+def committed_paths(repo_path):
+    """Every path in HEAD, read from the local object store without touching the worktree or network"""
+    result = subprocess.run(
+        ['git', '-C', str(repo_path), 'ls-tree', '-r', '--name-only', 'HEAD'],
+        capture_output=True, text=True
+    )
+    return set(result.stdout.splitlines()) if result.returncode == 0 else set()
+
+
+def describe_repo(repo_path, remote_url, bare=False):
+    if git_dir(repo_path):
+        return f"{repo_path} (exists; would pull)"
+    return f"{repo_path} (missing; would clone {'--bare ' if bare else ''}{redact(remote_url)})"
+
+
+def describe_rate(requests, rps):
+    if not rps:
+        return f"at least {requests} request(s), unthrottled"
+    return f"at least {requests} request(s), {requests / rps:.0f}s or more at {rps:g} requests/sec"
+
+
+def open_journal(args):
+    """The import journal if it exists; a dry run never creates one"""
+    from journal import Journal
+    gdir = git_dir(LOCAL_REPO_PATH)
+    path = Path(args.journal) if args.journal else (gdir / JOURNAL_FILENAME if gdir else None)
+    return Journal(path) if path and path.exists() else None
+
+
+def plan_import(args):
+    """Print what an import, retry, resume or incremental run would do; nothing is written or fetched"""
+    from journal import STATES
+
+    print("DRY RUN - nothing will be fetched, written or pushed")
+    print(f"Notes repository: {describe_repo(LOCAL_REPO_PATH, REMOTE_URL, args.bare)}")
+    journal = open_journal(args)
+    if journal is None:
+        return _plan_import(args, None)
+    try:
+        counts = journal.counts()
+        summary = ', '.join(f"{counts[state]} {state}" for state in STATES if counts.get(state))
+        print(f"Import journal: {summary or 'empty'}")
+        _plan_import(args, journal)
+    finally:
+        journal.close()
+
+
+def _plan_import(args, journal):
+    from journal import COMMITTED, FETCHING, PENDING, RENDERED
+
+    concurrency = 1 if args.sequential else args.concurrency
+    if args.retry_failed or args.resume:
+        if journal is None:
+            print("No import journal yet - nothing to retry or resume")
+            return
+        if args.retry_failed:
+            failures = journal.failures()
+            print(f"Would retry {len(failures)} failed date(s), {concurrency} at a time:")
+            for date_str, attempts, error in failures:
+                print(f"  {date_str}: {error} ({attempts} attempt(s))")
+            dates = [date_str for date_str, _, _ in failures]
+        else:
+            dates = journal.dates(PENDING, FETCHING, RENDERED)
+            print(f"Would resume {len(dates)} unfinished date(s): {date_ranges(dates) or '-'}")
+        if dates:
+            print(f"Requests: {describe_rate(len(dates), args.rps)}")
+        return
+
+    if args.incremental:
+        from sync_state import SyncState
+        if not git_dir(LOCAL_REPO_PATH):
+            print("No clone yet - the first incremental run starts from yesterday")
+            return
+        state = SyncState(LOCAL_REPO_PATH)
+        start_date = state.window_start(args.lookback_days, TIMEZONE)
+        print(f"Would fetch lifelogs from {start_date} to {local_now(TIMEZONE):%Y-%m-%d} "
+              f"(last synced {state.last_synced or 'never'})")
+        return
+
+    # The same range run() would import
+    end_date = args.end_date
+    start_date = args.start_date
+    if args.days_back:
+        end = local_now(TIMEZONE)
+        start_date = (end - timedelta(days=args.days_back)).strftime('%Y-%m-%d')
+        end_date = end.strftime('%Y-%m-%d')
+    if not start_date:
+        # The real run asks the API first; without the network, assume its fallback
+        start_date = (local_now(TIMEZONE) - timedelta(days=365)).strftime('%Y-%m-%d')
+        print("No --start-date: the run asks the API for its range; assuming the fallback of 365 days")
+
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    dates = [(start + timedelta(days=i)).strftime('%Y-%m-%d') for i in range((end - start).days + 1)]
+
+    extension = RENDERERS[args.format].extension
+    from rendering import note_relpath
+    existing = committed_paths(LOCAL_REPO_PATH) if git_dir(LOCAL_REPO_PATH) else set()
+    committed = set(journal.dates(COMMITTED)) if journal and not args.force else set()
+    skipped = [d for d in dates if d in committed or note_relpath(d, extension).as_posix() in existing]
+    to_fetch = dates if args.force else [d for d in dates if d not in set(skipped)]
+
+    print(f"Date range: {start_date} to {end_date} ({len(dates)} day(s))")
+    if args.force:
+        print(f"--force: every day is re-fetched; {len(skipped)} existing note(s) are rewritten only if changed")
+    elif skipped:
+        print(f"Already imported: {len(skipped)} day(s)")
+    print(f"Would fetch {len(to_fetch)} day(s): {date_ranges(to_fetch) or '-'}")
+    if to_fetch:
+        if args.single_pass:
+            print("Mode: single pass (one windowed download, split by day locally)")
+        else:
+            print(f"Mode: {concurrency} request(s) in flight, {args.render_workers or 'no'} render worker(s)")
+        print(f"Requests: {describe_rate(len(to_fetch), args.rps)}")
+        bare = args.bare if not git_dir(LOCAL_REPO_PATH) else git_dir(LOCAL_REPO_PATH) == Path(LOCAL_REPO_PATH)
+        writer = 'fast-import' if args.direct_odb or bare else 'worktree + one index update per commit'
+        print(f"Output: {args.format} notes via {writer}"
+              + ("" if args.no_index else ", search index") + ("" if args.no_archive else ", Arrow archive"))
+
+
+def plan_sync(args):
+    """Print what the daily sync would do for each account; nothing is written or fetched"""
+    from sync_state import SyncState
+
+    print("DRY RUN - nothing will be fetched, written or pushed")
+    if args.accounts:
+        from accounts import load_accounts
+        try:
+            profiles, concurrency = load_accounts(args.accounts)
+        except (OSError, ValueError) as e:
+            # The real sync would stop here too
+            print(f"Cannot read accounts from {args.accounts}: {e}")
+            return
+        concurrency = args.concurrency or concurrency
+        print(f"{len(profiles)} account(s) from {args.accounts}, {concurrency} at a time")
+        targets = [(p.name, p.repo_path, p.remote_url, p.timezone, p.rps) for p in profiles]
+    else:
+        targets = [(None, LOCAL_REPO_PATH, REMOTE_URL, TIMEZONE, DEFAULT_RPS)]
+
+    for name, repo_path, remote_url, timezone, rps in targets:
+        now = local_now(timezone)
+        today = now.strftime('%Y-%m-%d')
+        if name:
+            print(f"\n[{name}] {timezone}, {rps:g} requests/sec")
+        print(f"Notes repository: {describe_repo(repo_path, remote_url)}")
+        if args.historical:
+            first = (now - timedelta(days=args.historical - 1)).strftime('%Y-%m-%d')
+            print(f"Would re-fetch {args.historical} day(s), {first} to {today}, one request per day")
+        elif git_dir(repo_path):
+            state = SyncState(repo_path)
+            print(f"Would fetch lifelogs from {state.window_start(timezone=timezone)} to {today} "
+                  f"(last synced {state.last_synced or 'never'})")
+        else:
+            print("Would fetch lifelogs from the start of the default window after cloning")
+
+    if not (args.once or args.historical):
+        print(f"\nThen every {args.interval:g} minutes (+/- {args.jitter:g}s) until stopped")
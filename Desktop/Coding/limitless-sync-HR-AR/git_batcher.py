@@ -0,0 +1,136 @@
+"""
+Git Commit Batcher
+Collects written note files and commits them in chunks with a single index
+update per chunk, pushing once at the end of a run
+"""
+
+import os
+import threading
+from pathlib import Path
+
+from metrics import count, span
+
+# GitPython's IndexFile.add() chdirs the whole process into the worktree, so
+# index updates of different repositories (one per account) must not overlap
+INDEX_LOCK = threading.Lock()
+
+
+def default_message(labels):
+    """Commit message for a chunk, from the labels (dates) of its files"""
+    labels = sorted(label for label in labels if label)
+    if not labels:
+        return "Update Limitless notes"
+    if len(labels) == 1:
+        return f"Add daily notes for {labels[0]}"
+    return f"Add daily notes for {labels[0]} to {labels[-1]} ({len(labels)} days)"
+
+
+class CommitBatcher:
+    """
+    Accumulate files and commit them together
+
+    A chunk is committed once it holds `max_days` files or `max_bytes` of
+    content (either limit may be None for unlimited); everything left is
+    committed by finish(), which also performs the only push of the run.
+    `on_commit`, if given, is called with the labels of every chunk once it
+    is in a commit.
+    """
+
+    def __init__(self, repo, max_days=None, max_bytes=None, on_commit=None):
+        self.repo = repo
+        self.root = Path(repo.working_tree_dir)
+        self.max_days = max_days
+        self.max_bytes = max_bytes
+        self.on_commit = on_commit
+        self.pending = {}  # relative path -> label (usually the date)
+        self.removed = {}  # relative path -> label, deleted in the next commit
+        self.pending_bytes = 0
+        self.commits = 0
+        self.lock = threading.Lock()
+
+    def _relative(self, path):
+        path = Path(path)
+        return str(path.relative_to(self.root)) if path.is_absolute() else str(path)
+
+    def add(self, path, label=None):
+        """Queue a file written inside the worktree, committing if the chunk is full"""
+        rel_path = self._relative(path)
+
+        with self.lock:
+            self.removed.pop(rel_path, None)
+            if rel_path not in self.pending:
+                self.pending_bytes += os.path.getsize(self.root / rel_path)
+            self.pending[rel_path] = label
+            full = (
+                (self.max_days and len(self.pending) >= self.max_days) or
+                (self.max_bytes and self.pending_bytes >= self.max_bytes)
+            )
+        if full:
+            self.commit()
+
+    def remove(self, path, label=None):
+        """Queue a file for deletion from the worktree and the next commit"""
+        rel_path = self._relative(path)
+        with self.lock:
+            self.pending.pop(rel_path, None)
+            self.removed[rel_path] = label
+
+    def commit(self, message=None):
+        """Stage every pending file in one index write and commit; returns True if a commit was made"""
+        with self.lock:
+            if not self.pending and not self.removed:
+                return False
+            paths = list(self.pending)
+            removed = list(self.removed)
+            labels = list(self.pending.values()) + list(self.removed.values())
+            self.pending = {}
+            self.removed = {}
+            self.pending_bytes = 0
+
+            with INDEX_LOCK:
+                with span('git_add', files=len(paths) + len(removed)):
+                    if paths:
+                        self.repo.index.add(paths)
+                    if removed:
+                        self.repo.index.remove(removed, working_tree=True, ignore_unmatch=True)
+                        # git rm leaves files it was not tracking
+                        for rel_path in removed:
+                            (self.root / rel_path).unlink(missing_ok=True)
+                with span('git_commit', files=len(paths)):
+                    if self.repo.head.is_valid() and not self.repo.index.diff("HEAD"):
+                        committed = False
+                    else:
+                        self.repo.index.commit(message or default_message(labels))
+                        committed = True
+            if not committed:
+                print("No changes to commit")
+            else:
+                self.commits += 1
+                count('git_commits')
+                print(f"Committed {len(paths) + len(removed)} file(s)")
+
+        # Either way, HEAD now holds these files
+        if self.on_commit:
+            self.on_commit([label for label in labels if label])
+        return committed
+
+    def push(self):
+        """Push once if anything was committed during the run"""
+        if not self.commits:
+            print("No new changes to commit")
+            return False
+        print("Pushing to GitHub...")
+        with span('git_push'):
+            self.repo.remote('origin').push()
+        print("✓ Successfully pushed to GitHub")
+        self.commits = 0
+        return True
+
+    def finish(self, message=None):
+        """Commit what is left and push; git errors are reported, not raised"""
+        try:
+            self.commit(message)
+            return self.push()
+        except Exception as e:
+            print(f"Git error: {e}")
+            return False
@@ -102,7 +102,7 @@ goto done
 :quick
 echo.
 echo Quick import - last 7 days...
-python bulk_import_limitless.py --days-back 7 --workers 1
+python bulk_import_limitless.py --days-back 7 --concurrency 1
 goto done
 
 :done
@@ -72,7 +72,7 @@ case $choice in
         ;;
     7)
         echo "Quick import - last 7 days..."
-        python3 bulk_import_limitless.py --days-back 7 --workers 1
+        python3 bulk_import_limitless.py --days-back 7 --concurrency 1
         ;;
     *)
         echo "Invalid choice. Exiting."
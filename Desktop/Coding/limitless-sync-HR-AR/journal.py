@@ -0,0 +1,150 @@
+"""
+Import Journal
+Durable per-date task state for the bulk importer, kept in SQLite (WAL)
+
+Every state change is appended to an event log and mirrored in a tasks
+table, each in its own transaction, so a run that is killed part-way
+can be resumed exactly where it stopped:
+
+    pending -> fetching -> rendered -> committed
+                       \\-> failed (error and attempt count kept)
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+JOURNAL_FILENAME = 'limitless-journal.sqlite'
+
+PENDING = 'pending'
+FETCHING = 'fetching'
+RENDERED = 'rendered'
+COMMITTED = 'committed'
+FAILED = 'failed'
+STATES = (PENDING, FETCHING, RENDERED, COMMITTED, FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    date TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    state TEXT NOT NULL,
+    error TEXT,
+    at TEXT NOT NULL
+);
+"""
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class Journal:
+    """
+    Task state for each date of an import
+
+    Safe to call from the fetch threads and the writer at the same time.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        # WAL with NORMAL sync survives a killed process; only power loss can drop the last writes
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+
+    def _transition(self, dates, state, error=None, attempt=False):
+        if isinstance(dates, str):
+            dates = [dates]
+        now = _now()
+        with self.lock:
+            self.db.execute('BEGIN')
+            for date in dates:
+                self.db.execute(
+                    """INSERT INTO tasks (date, state, attempts, error, updated_at) VALUES (?, ?, ?, ?, ?)
+                       ON CONFLICT (date) DO UPDATE SET
+                           state = excluded.state,
+                           attempts = attempts + ?,
+                           error = excluded.error,
+                           updated_at = excluded.updated_at""",
+                    (date, state, int(attempt), error, now, int(attempt))
+                )
+                self.db.execute(
+                    'INSERT INTO events (date, state, error, at) VALUES (?, ?, ?, ?)',
+                    (date, state, error, now)
+                )
+            self.db.execute('COMMIT')
+
+    def enqueue(self, dates):
+        """Add dates not yet in the journal as pending; known dates keep their state"""
+        now = _now()
+        with self.lock:
+            self.db.execute('BEGIN')
+            self.db.executemany(
+                'INSERT OR IGNORE INTO tasks (date, state, updated_at) VALUES (?, ?, ?)',
+                ((date, PENDING, now) for date in dates)
+            )
+            self.db.execute('COMMIT')
+
+    def start(self, date):
+        """Mark a date as being fetched, counting the attempt"""
+        self._transition(date, FETCHING, attempt=True)
+
+    def mark(self, dates, state):
+        self._transition(dates, state)
+
+    def fail(self, date, error):
+        self._transition(date, FAILED, error=str(error))
+
+    def state(self, date):
+        with self.lock:
+            row = self.db.execute('SELECT state FROM tasks WHERE date = ?', (date,)).fetchone()
+        return row[0] if row else None
+
+    def dates(self, *states):
+        """Dates currently in any of `states`, oldest first"""
+        marks = ','.join('?' * len(states))
+        with self.lock:
+            rows = self.db.execute(
+                f'SELECT date FROM tasks WHERE state IN ({marks}) ORDER BY date', states
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def failures(self):
+        """(date, attempts, error) for every failed date"""
+        with self.lock:
+            return self.db.execute(
+                'SELECT date, attempts, error FROM tasks WHERE state = ? ORDER BY date', (FAILED,)
+            ).fetchall()
+
+    def counts(self):
+        """{state: number of dates}"""
+        with self.lock:
+            return dict(self.db.execute('SELECT state, COUNT(*) FROM tasks GROUP BY state').fetchall())
+
+    def migrate_failed_file(self, path):
+        """Import a legacy failed_imports.txt as failed tasks and remove it"""
+        path = Path(path)
+        if not path.exists():
+            return 0
+        dates = [line.strip() for line in path.read_text().splitlines() if line.strip()]
+        for date in dates:
+            self.fail(date, f'imported from {path.name}')
+        path.unlink()
+        print(f"Moved {len(dates)} date(s) from {path.name} into the import journal")
+        return len(dates)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,311 @@
+"""
+Limitless API Client
+Date-windowed, paginated access to the /lifelogs endpoint shared by the
+bulk importer and the daily sync
+
+Responses are streamed and, when ijson is installed, decoded incrementally:
+each lifelog is turned into a compact Lifelog as soon as its closing brace
+arrives, so the raw body, its text and the full object tree of a page are
+never held at once.
+"""
+
+import time
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+from metrics import count, span
+from rate_limit import RetryPolicy, parse_rate_limit_reset
+from segments import Lifelog, parse_lifelogs
+from settings import DEFAULT_BASE_URL, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from timestamps import localize
+
+MAX_PAGE_SIZE = 10  # Largest page the lifelogs endpoint will return
+
+# urllib3 only decodes brotli when a brotli package is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; without it each page is decoded whole
+    ijson = None
+
+LIFELOG_PREFIX = 'data.lifelogs.item'
+CURSOR_PREFIX = 'meta.lifelogs.nextCursor'
+
+# A body that is not valid JSON; requests' JSONDecodeError is a ValueError
+JSON_ERRORS = (ValueError, ijson.JSONError) if ijson else (ValueError,)
+# Failures while reading a body that are worth another attempt
+TRANSIENT_ERRORS = (
+    requests.exceptions.Timeout,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class LimitlessAPIError(Exception):
+    """Raised when the Limitless API answers with an unexpected status"""
+
+    def __init__(self, status_code, message='', response=None):
+        super().__init__(f"HTTP {status_code}: {message}" if message else f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = response
+
+
+def create_session(pool_size=10):
+    """
+    Build a keep-alive session whose connection pool fits `pool_size` workers
+
+    The pool blocks instead of opening throwaway connections when every
+    slot is busy, so a long backfill reuses the same few TLS connections.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    return session
+
+
+def bucket_by_date(lifelogs, timezone):
+    """Group lifelogs by the local date (in `timezone`) of their startTime"""
+    lifelogs = list(lifelogs)
+    days, _ = localize([log.get('startTime') for log in lifelogs], timezone)
+    buckets = {}
+
+    for log, date_str in zip(lifelogs, days):
+        if date_str:
+            buckets.setdefault(date_str, []).append(log)
+
+    return buckets
+
+
+def iter_page_events(stream):
+    """
+    Incrementally decode a /lifelogs body from a file-like `stream`
+
+    Yields ('lifelog', Lifelog) for each lifelog as it completes and
+    ('cursor', value) when the next-page cursor is read.
+    """
+    builder = None
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == LIFELOG_PREFIX and event == 'end_map':
+                yield 'lifelog', Lifelog.from_dict(builder.value)
+                builder = None
+        elif prefix == LIFELOG_PREFIX and event == 'start_map':
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+        elif prefix == CURSOR_PREFIX:
+            yield 'cursor', value
+
+
+def decode_page(response):
+    """
+    (Lifelogs, next_cursor) from a streamed /lifelogs response
+
+    A read that times out or a connection dropped part way through the body
+    raises the matching requests exception, and a body that is not valid
+    JSON raises LimitlessAPIError, so callers only deal with those two.
+    """
+    try:
+        return _decode_page(response)
+    except urllib3.exceptions.ReadTimeoutError as e:
+        raise requests.exceptions.ReadTimeout(e, response=response) from e
+    except urllib3.exceptions.HTTPError as e:
+        raise requests.exceptions.ConnectionError(e, response=response) from e
+    except JSON_ERRORS as e:
+        raise LimitlessAPIError(response.status_code, f"invalid JSON body: {e}", response) from e
+
+
+def _decode_page(response):
+    if ijson is None:
+        body = response.json() or {}
+        lifelogs = (body.get('data') or {}).get('lifelogs') or []
+        next_cursor = ((body.get('meta') or {}).get('lifelogs') or {}).get('nextCursor')
+        return parse_lifelogs(lifelogs), next_cursor
+
+    # Let urllib3 undo gzip/brotli while ijson reads
+    response.raw.decode_content = True
+    lifelogs, next_cursor = [], None
+    for kind, value in iter_page_events(response.raw):
+        if kind == 'lifelog':
+            lifelogs.append(value)
+        else:
+            next_cursor = value
+    return lifelogs, next_cursor
+
+
+class LimitlessClient:
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, timezone=None,
+                 page_size=MAX_PAGE_SIZE, rate_limiter=None, retry_policy=None,
+                 session=None, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, cache=None, offline=False):
+        self.base_url = base_url.rstrip('/')
+        self.headers = {
+            "X-API-Key": api_key,
+            "Content-Type": "application/json"
+        }
+        self.timezone = timezone
+        self.page_size = min(page_size, MAX_PAGE_SIZE)
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = session or create_session()
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cache = cache
+        self.offline = offline
+
+    def build_params(self, date=None, start=None, end=None, direction='asc', cursor=None):
+        """
+        Build query parameters for a windowed /lifelogs request
+
+        Args:
+            date: Single day (YYYY-MM-DD) in the client timezone
+            start: Window start (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS)
+            end: Window end (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS)
+            direction: 'asc' or 'desc' by start time
+            cursor: Pagination cursor from a previous page
+        """
+        params = {
+            "limit": self.page_size,
+            "direction": direction
+        }
+        if self.timezone:
+            params["timezone"] = self.timezone
+        if date:
+            params["date"] = date
+        if start:
+            params["start"] = start
+        if end:
+            params["end"] = end
+        if cursor:
+            params["cursor"] = cursor
+        return params
+
+    def wait(self, delay, throttled=False):
+        """Sleep before a retry, pausing every worker when the API throttled us"""
+        if throttled and self.rate_limiter:
+            count('throttle_pauses')
+            count('throttle_seconds', delay)
+            self.rate_limiter.pause(delay)
+        else:
+            time.sleep(delay)
+
+    def request(self, params, extra_headers=None):
+        """
+        GET /lifelogs with rate limiting and bounded retries
+
+        Returns (response, page). A 200 body is decoded inside the retry
+        loop, so a read that times out or is cut off part way is retried like
+        a failed request; page is its (Lifelogs, next_cursor) and the response
+        is already closed. Any other response is returned with page None,
+        still streamed; callers must read it or close it.
+        """
+        headers = {**self.headers, **extra_headers} if extra_headers else self.headers
+        attempt = 0
+
+        while True:
+            attempt += 1
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+
+            page = None
+            try:
+                with span('http_request', attempt=attempt) as fields:
+                    response = self.session.get(
+                        f"{self.base_url}/lifelogs",
+                        headers=headers,
+                        params=params,
+                        timeout=self.timeout,
+                        stream=True
+                    )
+                    fields['status'] = response.status_code
+                if response.status_code == 200:
+                    with response, span('decode', lifelogs=0) as fields:
+                        page = decode_page(response)
+                        fields['lifelogs'] = len(page[0])
+                    count('http_bytes', response.raw.tell())
+            except TRANSIENT_ERRORS as e:
+                count('http_requests', status=type(e).__name__)
+                if not self.retry_policy.can_retry(attempt):
+                    raise
+                count('http_retries', reason=type(e).__name__)
+                delay = self.retry_policy.delay_for(attempt)
+                print(f"  {type(e).__name__}, retrying in {delay:.1f}s (attempt {attempt})")
+                self.wait(delay)
+                continue
+
+            count('http_requests', status=response.status_code)
+            if self.retry_policy.should_retry(response.status_code) and self.retry_policy.can_retry(attempt):
+                count('http_retries', reason=response.status_code)
+                delay = self.retry_policy.delay_for(attempt, response)
+                print(f"  HTTP {response.status_code}, retrying in {delay:.1f}s (attempt {attempt})")
+                response.close()
+                self.wait(delay, throttled=response.status_code == 429)
+                continue
+
+            if response.status_code == 200 and self.rate_limiter:
+                self.rate_limiter.record_success()
+                # Out of quota for this window: slow everyone down before the 429s start
+                reset = parse_rate_limit_reset(response.headers)
+                if reset:
+                    count('quota_pauses')
+                    self.rate_limiter.pause(reset)
+            return response, page
+
+    def get_page(self, params):
+        """Fetch a single page, returning (Lifelogs, next_cursor)"""
+        cached = self.cache.get_page(params) if self.cache else None
+        if self.offline:
+            if cached is None:
+                # Same meaning as an only-if-cached miss in HTTP caching
+                raise LimitlessAPIError(504, "not in cache (offline)")
+            count('cache_hits')
+            return parse_lifelogs(cached.lifelogs), cached.next_cursor
+
+        response, page = self.request(params, cached.conditional_headers() if cached else None)
+
+        if page is None:
+            with response:
+                if response.status_code == 304 and cached:
+                    count('cache_revalidated')
+                    return parse_lifelogs(cached.lifelogs), cached.next_cursor
+                if response.status_code == 404:
+                    return [], None
+                raise LimitlessAPIError(response.status_code, response.text[:200], response)
+
+        lifelogs, next_cursor = page
+        if self.cache:
+            self.cache.put_page(params, lifelogs, next_cursor, response.headers)
+        return lifelogs, next_cursor
+
+    def iter_pages(self, date=None, start=None, end=None, direction='asc'):
+        """Yield one list of lifelogs per page until the cursor runs out"""
+        params = self.build_params(date=date, start=start, end=end, direction=direction)
+
+        while True:
+            lifelogs, next_cursor = self.get_page(params)
+            if lifelogs:
+                yield lifelogs
+            if not next_cursor:
+                return
+            params["cursor"] = next_cursor
+
+    def iter_lifelogs(self, date=None, start=None, end=None, direction='asc'):
+        """Yield lifelogs one at a time across all pages of a window"""
+        for page in self.iter_pages(date=date, start=start, end=end, direction=direction):
+            yield from page
+
+    def lifelogs_for_date(self, date):
+        """Return every lifelog recorded on a single local date"""
+        return list(self.iter_lifelogs(date=date))
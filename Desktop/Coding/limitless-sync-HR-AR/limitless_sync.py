@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Limitless Sync
+One command line for the bulk importer, the daily sync, retries, search and
+archive statistics
+
+Usage:
+    python3 limitless_sync.py import --days-back 30
+    python3 limitless_sync.py import --days-back 365 --dry-run
+    python3 limitless_sync.py sync --once
+    python3 limitless_sync.py sync --accounts accounts.json --interval 5
+    python3 limitless_sync.py retry
+    python3 limitless_sync.py search "quarterly budget" --speaker You
+    python3 limitless_sync.py stats --since 2024-01-01
+
+Only the standard library and light local modules are loaded up front, so
+--help and --dry-run return without importing requests, GitPython, NumPy or
+pyarrow. Commands import what they need when they run, and only import, sync
+and retry open the notes repository or the network. --dry-run prints a plan
+worked out from local state alone (see dry_run.py).
+
+The options come from cli_args.py, which the older entry points share, so
+bulk_import_limitless.py, limitless_to_github.py, search_index.py and
+archive.py keep accepting exactly the same options.
+"""
+
+import argparse
+
+from cli_args import (
+    add_importer_arguments,
+    add_range_arguments,
+    add_run_arguments,
+    add_search_arguments,
+    add_stats_arguments,
+    add_sync_arguments,
+)
+from dry_run import plan_import, plan_sync
+from settings import DEFAULT_ARCHIVE_DIR, DEFAULT_SEARCH_DB
+
+
+# Commands
+
+def command_import(args):
+    if args.dry_run:
+        return plan_import(args)
+    import bulk_import_limitless
+    bulk_import_limitless.execute(args)
+
+
+def command_sync(args):
+    if args.dry_run:
+        return plan_sync(args)
+    import limitless_to_github
+    limitless_to_github.sync_command(args)
+
+
+def command_search(args):
+    import search_index
+    search_index.run_search(args)
+
+
+def command_stats(args):
+    import archive
+    archive.run_stats(args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='limitless_sync.py',
+        description='Sync Limitless Pendant lifelogs into a notes repository, then search and analyse them'
+    )
+    commands = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+
+    imports = commands.add_parser('import', help='Import a range of days (the bulk importer)',
+                                  description='Import a range of days into the notes repository')
+    add_range_arguments(imports)
+    imports.add_argument(
+        '--resume',
+        action='store_true',
+        help='Finish the dates an interrupted import left pending or uncommitted'
+    )
+    add_importer_arguments(imports)
+    add_run_arguments(imports)
+    imports.set_defaults(handler=command_import, retry_failed=False)
+
+    retry = commands.add_parser('retry', help='Retry every failed date in the import journal',
+                                description='Retry every failed date in the import journal concurrently')
+    add_importer_arguments(retry)
+    add_run_arguments(retry)
+    # The range options do not apply; execute() still reads them
+    retry.set_defaults(handler=command_import, retry_failed=True, resume=False, incremental=False,
+                       force=False, start_date=None, end_date=None, days_back=None, single_pass=False,
+                       lookback_days=1)
+
+    sync = commands.add_parser('sync', help='Incremental sync, once or as a daemon',
+                               description='Fetch new lifelogs and commit the days they change')
+    add_sync_arguments(sync)
+    sync.set_defaults(handler=command_sync)
+
+    search = commands.add_parser('search', help='Full-text search over transcripts',
+                                 description='Full-text search over transcript segments')
+    search.add_argument('--db', default=DEFAULT_SEARCH_DB, help=f'Index database (default: {DEFAULT_SEARCH_DB})')
+    add_search_arguments(search)
+    search.set_defaults(handler=command_search)
+
+    stats = commands.add_parser('stats', help='Talk time, words and speaker share from the archive',
+                                description='Per-day talk time, words and speaker share')
+    stats.add_argument('--archive-dir', default=DEFAULT_ARCHIVE_DIR,
+                       help=f'Archive root (default: {DEFAULT_ARCHIVE_DIR})')
+    add_stats_arguments(stats)
+    stats.set_defaults(handler=command_stats)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,177 +4,216 @@ Limitless to GitHub Daily Notes Sync
 Pulls transcripts from Limitless API and commits to GitHub with date-based organization
 """
 
+import argparse
 import os
-import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from git import Repo
-import schedule
 import time
+from contextlib import nullcontext
 from pathlib import Path
 
-# Configuration
-LIMITLESS_API_KEY = os.environ.get('LIMITLESS_API_KEY', 'your-api-key-here')
-GITHUB_TOKEN = os.environ.get('GITHUB_TOKEN', 'your-github-token-here')
-GITHUB_USERNAME = os.environ.get('GITHUB_USERNAME', 'HR-AR')
-REPO_NAME = 'limitless-notes'
-LOCAL_REPO_PATH = os.path.expanduser(f'~/Documents/{REPO_NAME}')
+from limitless_client import LimitlessAPIError, LimitlessClient, bucket_by_date, create_session
+from rendering import iter_markdown, note_relpath, write_atomic
+from response_cache import ResponseCache
+from git_batcher import CommitBatcher
+from rate_limit import TokenBucket
+from sync_state import SyncState
+from timestamps import local_now
+from manifest import ContentManifest, content_hash
+from search_index import SearchIndex
+from archive import ARCHIVE_AVAILABLE, LifelogArchive
+from repo_setup import open_repo, pull_repo, sparse_checkout_dates
+from metrics import METRICS, count, profiling, span
+from accounts import load_accounts
+from sync_daemon import SyncDaemon
+from cli_args import add_sync_arguments
+from dry_run import plan_sync
+# Configuration and defaults (environment variables) live in settings.py
+from settings import (
+    API_URL,
+    DEFAULT_ACCOUNT_CONCURRENCY,
+    DEFAULT_ARCHIVE_DIR,
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CLONE_DEPTH,
+    DEFAULT_RPS,
+    DEFAULT_SEARCH_DB,
+    LIMITLESS_API_KEY,
+    LOCAL_REPO_PATH,
+    REMOTE_URL,
+    TIMEZONE,
+)
 
 class LimitlessToGitHub:
-    def __init__(self):
-        self.base_url = "https://api.limitless.ai/v1"  # Update with actual API endpoint
-        self.headers = {
-            "Authorization": f"Bearer {LIMITLESS_API_KEY}",
-            "Content-Type": "application/json"
-        }
+    """
+    Incremental sync of one account's lifelogs into its notes repository
+
+    Every override defaults to the module configuration (environment
+    variables), so LimitlessToGitHub() syncs the single configured account;
+    MultiAccountSync passes a profile's values and a shared session.
+    """
+    def __init__(self, commit_every_days=None, clone_depth=DEFAULT_CLONE_DEPTH, api_key=None,
+                 remote_url=None, repo_path=None, timezone=None, session=None, rate_limiter=None,
+                 cache_dir=DEFAULT_CACHE_DIR, search_db=DEFAULT_SEARCH_DB, archive_dir=DEFAULT_ARCHIVE_DIR,
+                 name=None):
+        self.base_url = API_URL
+        self.name = name
+        self.remote_url = remote_url or REMOTE_URL
+        self.repo_path = repo_path or LOCAL_REPO_PATH
+        self.timezone = timezone or TIMEZONE
+        # Kept for the life of the process so daemon syncs reuse the connection
+        self.session = session or create_session(pool_size=1)
+        self.client = LimitlessClient(
+            api_key or LIMITLESS_API_KEY,
+            self.base_url,
+            timezone=self.timezone,
+            session=self.session,
+            # Limits are per API key, so each account has its own bucket
+            rate_limiter=rate_limiter or TokenBucket(DEFAULT_RPS),
+            cache=ResponseCache(cache_dir) if cache_dir else None
+        )
+        self.clone_depth = clone_depth
         self.setup_repo()
+        self.batcher = CommitBatcher(self.repo, max_days=commit_every_days)
+        self.manifest = ContentManifest(self.repo_path)
+        self.search_index = SearchIndex(search_db, timezone=self.timezone) if search_db else None
+        self.archive = LifelogArchive(archive_dir) if ARCHIVE_AVAILABLE and archive_dir else None
     
     def setup_repo(self):
         """Clone or pull the repository"""
-        if not os.path.exists(LOCAL_REPO_PATH):
-            print(f"Cloning repository to {LOCAL_REPO_PATH}")
-            Repo.clone_from(
-                f"https://{GITHUB_TOKEN}@github.com/{GITHUB_USERNAME}/{REPO_NAME}.git",
-                LOCAL_REPO_PATH
-            )
-        else:
-            print("Repository already exists, pulling latest changes")
-            self.repo = Repo(LOCAL_REPO_PATH)
-            origin = self.repo.remote('origin')
-            origin.pull()
+        # Shallow, blob-less and sparse, so start-up stays constant as the notes grow
+        self.repo = open_repo(
+            self.repo_path,
+            self.remote_url,
+            depth=self.clone_depth
+        )
+        self.pulled_at = time.monotonic()
+    
+    def refresh_repo(self, max_age=60):
+        """Pull into the open clone unless it was pulled in the last `max_age` seconds"""
+        # A long-running daemon would otherwise commit on top of a stale branch
+        if time.monotonic() - self.pulled_at < max_age:
+            return
+        pull_repo(self.repo)
+        self.pulled_at = time.monotonic()
     
     def fetch_daily_transcript(self, date=None):
         """Fetch transcript from Limitless API for a specific date"""
         if date is None:
-            date = datetime.now().strftime('%Y-%m-%d')
-        
-        # Adjust this endpoint based on actual Limitless API documentation
-        # This is a template - you'll need to check Limitless docs for exact endpoint
-        endpoint = f"{self.base_url}/transcripts"
-        params = {
-            "date": date,
-            "limit": 100  # Adjust based on your needs
-        }
+            date = local_now(self.timezone).strftime('%Y-%m-%d')
         
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            # Only the requested day is fetched, page by page
+            lifelogs = self.client.lifelogs_for_date(date)
+            return lifelogs or None
+        except (requests.exceptions.RequestException, LimitlessAPIError) as e:
             print(f"Error fetching from Limitless API: {e}")
             return None
     
-    def format_transcript(self, data):
+    def format_transcript(self, data, date=None):
         """Format the transcript data into markdown"""
-        date = datetime.now()
-        
-        # Create markdown content
-        content = f"""# Daily Notes - {date.strftime('%B %d, %Y')}
-
-**Date**: {date.strftime('%Y-%m-%d')}  
-**Day**: {date.strftime('%A')}  
-**Time Generated**: {date.strftime('%I:%M %p')}
-
----
-
-## Transcript
-
-"""
-        
-        # Add transcript content (adjust based on actual API response structure)
-        if isinstance(data, dict):
-            # Example: if API returns conversations/segments
-            if 'conversations' in data:
-                for idx, conversation in enumerate(data['conversations'], 1):
-                    content += f"\n### Conversation {idx}\n"
-                    content += f"**Time**: {conversation.get('timestamp', 'N/A')}\n\n"
-                    content += f"{conversation.get('text', '')}\n\n"
-            elif 'transcript' in data:
-                content += data['transcript']
-            else:
-                # Fallback: just dump the JSON prettily
-                content += "```json\n"
-                content += json.dumps(data, indent=2)
-                content += "\n```"
-        else:
-            content += str(data)
-        
-        # Add metadata footer
-        content += f"""
-
----
-
-## Metadata
-
-- **Source**: Limitless Pendant
-- **Sync Time**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-- **API Version**: v1
-
----
-
-*This note was automatically generated and synced to GitHub*
-"""
-        
-        return content
+        return ''.join(self.iter_transcript(data, date))
+    
+    def iter_transcript(self, data, date=None):
+        """Yield the markdown note as chunks so large days stream straight to disk"""
+        if date is None:
+            date = local_now(self.timezone)
+        return iter_markdown(data, date.strftime('%Y-%m-%d'), style='sync', timezone=self.timezone)
     
-    def save_and_commit(self, content, date=None):
-        """Save content to file and commit to GitHub"""
+    def save_note(self, content, date=None):
+        """Save content (a string or an iterable of chunks) to file and queue it for commit"""
         if date is None:
-            date = datetime.now()
+            date = local_now(self.timezone)
+        date_str = date.strftime('%Y-%m-%d')
         
         # Create directory structure: year/month/day.md
-        year = date.strftime('%Y')
-        month = date.strftime('%m-%B')
-        day = date.strftime('%d')
-        filename = f"{date.strftime('%Y-%m-%d')}-notes.md"
+        file_path = Path(self.repo_path) / note_relpath(date_str)
         
-        # Create path
-        file_path = Path(LOCAL_REPO_PATH) / year / month / filename
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Write file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # Stream to a temp file and rename it into place
+        if isinstance(content, str):
+            content = [content]
+        write_atomic(file_path, content)
         
         print(f"Saved notes to {file_path}")
+        self.batcher.add(file_path, date_str)
+        return file_path
+    
+    def save_if_changed(self, data, date):
+        """Render and save a day unless its note was written from the same content; returns True if saved"""
+        date_str = date.strftime('%Y-%m-%d')
+        rel_path = note_relpath(date_str)
+        digest = content_hash(data)
+        if self.search_index is not None:
+            with span('search_index', date=date_str):
+                self.search_index.index_day(date_str, data, digest)
+        if self.archive is not None:
+            with span('archive', date=date_str):
+                self.archive.append_day(date_str, data, digest)
+        if self.manifest.unchanged(rel_path, digest) and (Path(self.repo_path) / rel_path).exists():
+            print(f"Notes for {date_str} unchanged")
+            return False
+        self.save_note(self.iter_transcript(data, date), date)
+        self.manifest.record(rel_path, digest)
+        return True
+    
+    def remove_day(self, date_str):
+        """Delete the note for a day whose lifelogs were all deleted upstream"""
+        print(f"No lifelogs left for {date_str}; removing its notes")
+        rel_path = note_relpath(date_str)
+        if self.search_index is not None:
+            self.search_index.index_day(date_str, [])
+        if self.archive is not None:
+            self.archive.append_day(date_str, [])
+        self.manifest.forget(rel_path)
+        self.batcher.remove(Path(self.repo_path) / rel_path, date_str)
+    
+    def finish(self, message=None):
+        """Queue the manifest if it changed, then commit and push once"""
+        if self.manifest.save():
+            self.batcher.add(self.manifest.path)
+        return self.batcher.finish(message)
+    
+    def sync_daily(self, lookback_days=1):
+        """
+        Incremental sync: fetch lifelogs since the last run and rewrite only the days they change
+        
+        What has been written is tracked per day in .sync_state.json.
+        """
+        account = f" for {self.name}" if self.name else ""
+        print(f"\n=== Starting daily sync{account} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
+        
+        self.refresh_repo()
+        state = SyncState(self.repo_path)
+        # Days are the account's local days, as bucket_by_date splits them, not the host's
+        start_date = state.window_start(lookback_days, self.timezone)
+        end_date = local_now(self.timezone).strftime('%Y-%m-%d')
         
-        # Git operations
         try:
-            repo = Repo(LOCAL_REPO_PATH)
-            
-            # Add file
-            repo.index.add([str(file_path.relative_to(LOCAL_REPO_PATH))])
-            
-            # Check if there are changes to commit
-            if repo.index.diff("HEAD"):
-                # Commit
-                commit_message = f"Add daily notes for {date.strftime('%Y-%m-%d')}"
-                repo.index.commit(commit_message)
-                
-                # Push
-                origin = repo.remote('origin')
-                origin.push()
-                
-                print(f"Successfully committed and pushed notes for {date.strftime('%Y-%m-%d')}")
-            else:
-                print("No changes to commit")
-                
-        except Exception as e:
-            print(f"Git error: {e}")
-    
-    def sync_daily(self):
-        """Main sync function to run daily"""
-        print(f"\n=== Starting daily sync at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
+            lifelogs = list(self.client.iter_lifelogs(start=start_date, end=f"{end_date} 23:59:59"))
+        except (requests.exceptions.RequestException, LimitlessAPIError) as e:
+            print(f"Error fetching from Limitless API: {e}")
+            print("=== Sync complete ===\n")
+            return
         
-        # Fetch today's transcript
-        data = self.fetch_daily_transcript()
+        buckets = bucket_by_date(lifelogs, self.timezone)
+        changed = state.changed_days(buckets, start_date, end_date)
         
-        if data:
-            # Format and save
-            content = self.format_transcript(data)
-            self.save_and_commit(content)
+        if changed:
+            sparse_checkout_dates(self.repo, changed)
+            for date_str in changed:
+                if date_str not in buckets:
+                    self.remove_day(date_str)
+                    state.forget(date_str)
+                    continue
+                date = datetime.strptime(date_str, '%Y-%m-%d')
+                self.save_if_changed(buckets[date_str], date)
+                state.record(date_str, buckets[date_str])
+            state.save()
+            self.batcher.add(state.path)
+            # One commit and one push for every day touched by this run
+            self.finish()
         else:
-            print("No data received from Limitless API")
+            print(f"No new or changed lifelogs since {start_date}")
         
         print("=== Sync complete ===\n")
     
@@ -182,58 +221,140 @@ class LimitlessToGitHub:
         """Sync historical data for the past N days"""
         print(f"Syncing historical data for the past {days_back} days...")
         
-        for i in range(days_back):
-            date = datetime.now() - timedelta(days=i)
+        today = local_now(self.timezone)
+        dates = [today - timedelta(days=i) for i in range(days_back)]
+        sparse_checkout_dates(self.repo, [date.strftime('%Y-%m-%d') for date in dates])
+        
+        for date in dates:
             date_str = date.strftime('%Y-%m-%d')
             print(f"Fetching data for {date_str}")
             
             data = self.fetch_daily_transcript(date_str)
             if data:
-                content = self.format_transcript(data)
-                self.save_and_commit(content, date)
-            
-            time.sleep(1)  # Be nice to the API
+                self.save_if_changed(data, date)
+        
+        # Commit in chunks (if configured) and push once at the end
+        self.finish()
 
-def main():
-    """Main execution"""
-    import sys
-    
-    syncer = LimitlessToGitHub()
-    
-    # Check for command line arguments
-    if len(sys.argv) > 1:
-        if sys.argv[1] == '--historical':
-            # Run historical sync
-            days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
-            print(f"Running historical sync for last {days} days...")
-            syncer.sync_historical(days_back=days)
-            return
-        elif sys.argv[1] == '--once':
-            # Run once and exit
-            syncer.sync_daily()
-            return
+class MultiAccountSync:
+    """
+    Sync many accounts from one process, at most `concurrency` at a time
+
+    All accounts share one keep-alive connection pool; each keeps its own
+    rate limiter, response cache, search index, archive and clone. An
+    account that fails - bad key, unreachable remote - is reported and the
+    rest carry on; one that could not be set up is retried next round.
+    """
+    def __init__(self, profiles, concurrency=DEFAULT_ACCOUNT_CONCURRENCY, clone_depth=DEFAULT_CLONE_DEPTH):
+        self.profiles = profiles
+        self.concurrency = max(1, min(concurrency, len(profiles)))
+        self.clone_depth = clone_depth
+        # One connection per account in flight; every account talks to the same host
+        self.session = create_session(pool_size=self.concurrency)
+        self.syncers = {}
     
-    # Default: Run once immediately then schedule
-    syncer.sync_daily()
+    def syncer(self, profile):
+        """The account's warm syncer, set up on first use"""
+        syncer = self.syncers.get(profile.name)
+        if syncer is None:
+            syncer = LimitlessToGitHub(
+                clone_depth=self.clone_depth,
+                api_key=profile.api_key,
+                remote_url=profile.remote_url,
+                repo_path=profile.repo_path,
+                timezone=profile.timezone,
+                session=self.session,
+                rate_limiter=TokenBucket(profile.rps),
+                cache_dir=profile.cache_dir,
+                search_db=profile.search_db,
+                archive_dir=profile.archive_dir,
+                name=profile.name
+            )
+            self.syncers[profile.name] = syncer
+        return syncer
+    
+    def run_account(self, profile, method, *args):
+        """Run one account's job; returns True if it completed"""
+        try:
+            with span('account_sync', account=profile.name):
+                getattr(self.syncer(profile), method)(*args)
+        except Exception as e:
+            print(f"[{profile.name}] sync failed: {type(e).__name__}: {e}")
+            count('account_syncs', account=profile.name, outcome='failed')
+            return False
+        count('account_syncs', account=profile.name, outcome='ok')
+        return True
     
-    # Optional: Sync historical data on first run
-    # Uncomment the next line to import last 30 days on first run
-    # syncer.sync_historical(days_back=30)
+    def run_all(self, method, *args):
+        """Run `method` (e.g. 'sync_daily') on every account; returns the names that failed"""
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='account') as pool:
+            results = list(pool.map(lambda profile: self.run_account(profile, method, *args), self.profiles))
+        failed = [profile.name for profile, ok in zip(self.profiles, results) if not ok]
+        print(f"Synced {len(self.profiles) - len(failed)}/{len(self.profiles)} account(s)"
+              + (f"; failed: {', '.join(failed)}" if failed else ""))
+        return failed
     
-    # Schedule daily runs (adjust time as needed)
-    schedule.every().day.at("23:00").do(syncer.sync_daily)  # Run at 11 PM daily
+    def sync_daily(self, lookback_days=1):
+        return self.run_all('sync_daily', lookback_days)
+    
+    def sync_historical(self, days_back=7):
+        return self.run_all('sync_historical', days_back)
+
+def run_sync(job, *args, profile_dir=None):
+    """Run one sync, then write its metrics whether or not it succeeded"""
+    success = False
+    try:
+        with profiling(profile_dir, 'daily_sync') if profile_dir else nullcontext():
+            job(*args)
+        success = True
+    finally:
+        METRICS.finish(success)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Sync new Limitless lifelogs into the notes repository, once or as a daemon'
+    )
+    # Shared with `limitless_sync.py sync` (cli_args.py)
+    add_sync_arguments(parser)
+    sync_command(parser.parse_args())
+
+def sync_command(args):
+    """Set up the syncer only once the arguments are known, then sync historically, once, or as a daemon"""
+    if args.dry_run:
+        plan_sync(args)
+        return
+    if args.accounts:
+        # Every account in the file, from this one process
+        profiles, file_concurrency = load_accounts(args.accounts)
+        concurrency = args.concurrency or file_concurrency
+        print(f"Syncing {len(profiles)} account(s) from {args.accounts}, {concurrency} at a time")
+        mode = 'multi_sync'
+        syncer = MultiAccountSync(profiles, concurrency)
+    else:
+        mode = 'daily_sync'
+        syncer = LimitlessToGitHub()
+    if not args.no_metrics:
+        METRICS.configure(mode, args.metrics_dir)
     
-    print("Scheduler started. Press Ctrl+C to stop.")
-    print(f"Next sync scheduled for: {schedule.next_run()}")
-    print("\nUsage options:")
-    print("  python limitless_to_github.py              # Run continuously")
-    print("  python limitless_to_github.py --once       # Run once and exit")
-    print("  python limitless_to_github.py --historical [days]  # Import historical data")
+    if args.historical:
+        print(f"Running historical sync for last {args.historical} days...")
+        run_sync(syncer.sync_historical, args.historical, profile_dir=args.profile)
+        return
+    if args.once:
+        run_sync(syncer.sync_daily, profile_dir=args.profile)
+        return
     
-    # Keep running
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
+    # Default: stay resident and sync incrementally every few minutes. The
+    # session, rate limiter, cache and clone are reused by every run, so a
+    # sync costs one revalidation request and a pull when nothing changed.
+    print(f"Syncing every {args.interval:g} minutes (+/- {args.jitter:g}s). Press Ctrl+C to stop.")
+    print(f"Send SIGHUP (kill -HUP {os.getpid()}) to sync immediately.")
+    daemon = SyncDaemon(
+        lambda: run_sync(syncer.sync_daily, profile_dir=args.profile),
+        interval=args.interval,
+        jitter=args.jitter
+    )
+    daemon.serve()
 
 if __name__ == "__main__":
     main()
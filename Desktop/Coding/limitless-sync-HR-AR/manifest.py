@@ -0,0 +1,85 @@
+"""
+Content Manifest
+Per-note hash of the lifelog data each file was rendered from, persisted as
+.content_manifest.json in the notes repository
+
+Hashes are taken over the lifelogs with volatile fields removed and keys
+and order normalised, so a file is only rewritten - and only shows up in
+git - when what it says would actually change.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from segments import to_plain
+
+MANIFEST_FILENAME = '.content_manifest.json'
+
+# Bumped by the API on edits that do not change the transcript
+VOLATILE_FIELDS = frozenset({'updatedAt'})
+
+
+def _strip_volatile(value):
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items() if k not in VOLATILE_FIELDS}
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    return value
+
+
+def content_hash(lifelogs):
+    """SHA-256 of a day's lifelogs, independent of key order, lifelog order and volatile fields"""
+    normalized = sorted(
+        (_strip_volatile(to_plain(log)) for log in lifelogs),
+        key=lambda log: (str(log.get('id')), log.get('startTime') or '')
+    )
+    payload = json.dumps(normalized, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ContentManifest:
+    """
+    Maps a note's path (relative to the repository) to its content hash
+
+    Only the thread that writes notes should call record().
+    """
+
+    def __init__(self, repo_path):
+        self.path = Path(repo_path) / MANIFEST_FILENAME
+        self.hashes = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self.hashes = json.load(f).get('notes', {})
+
+    def unchanged(self, rel_path, digest):
+        """True if the note at `rel_path` was last written from content with this hash"""
+        return self.hashes.get(Path(rel_path).as_posix()) == digest
+
+    def record(self, rel_path, digest):
+        rel_path = Path(rel_path).as_posix()
+        if self.hashes.get(rel_path) != digest:
+            self.hashes[rel_path] = digest
+            self.dirty = True
+
+    def forget(self, rel_path):
+        if self.hashes.pop(Path(rel_path).as_posix(), None) is not None:
+            self.dirty = True
+
+    def save(self):
+        """Write the manifest atomically if anything changed; returns True if it was written"""
+        if not self.dirty:
+            return False
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'notes': dict(sorted(self.hashes.items()))}, f, indent=2)
+            f.write('\n')
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+        return True
@@ -0,0 +1,258 @@
+"""
+Run Metrics
+Timing spans and counters for the hot paths of a run, logged as JSON lines
+and summarised in a Prometheus textfile when the run ends
+
+Stages timed: git_clone/git_pull (repo setup), http_request (one per
+attempt), decode (body read and JSON decode), fetch_date, render, write
+(includes rendering when a note is streamed to disk), search_index,
+archive, git_add, git_commit, git_checkout and git_push.
+
+Every span is appended to <metrics dir>/<run>.jsonl as it ends; finish()
+writes <metrics dir>/limitless_<run>.prom atomically, so node_exporter's
+textfile collector can pick it up, and prints a timing table.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from settings import DEFAULT_METRICS_DIR
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _quantile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+class Metrics:
+    """
+    Spans and counters for one run
+
+    Safe to use from the fetch threads; nothing is written to disk until
+    configure() has been called.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.run = None
+        self.log = None
+        self.textfile = None
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.durations = {}  # stage -> [seconds, ...]
+            self.counters = {}  # (name, ((label, value), ...)) -> total
+
+    def configure(self, run, directory=DEFAULT_METRICS_DIR, log=True, textfile=True):
+        """Start logging spans for `run` (e.g. 'bulk_import') under `directory`"""
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        self.run = run
+        self.textfile = Path(directory) / f"limitless_{run}.prom" if textfile else None
+        if self.log:
+            self.log.close()
+        self.log = open(Path(directory) / f"{run}.jsonl", 'a', encoding='utf-8', buffering=1) if log else None
+        self.reset()
+
+    def _write(self, record):
+        if self.log is None:
+            return
+        line = json.dumps(
+            {'ts': datetime.now().isoformat(timespec='milliseconds'), 'run': self.run, **record},
+            default=str, ensure_ascii=False
+        )
+        with self.lock:
+            self.log.write(line + "\n")
+
+    def observe(self, stage, seconds, **fields):
+        with self.lock:
+            self.durations.setdefault(stage, []).append(seconds)
+        self._write({'event': 'span', 'stage': stage, 'seconds': round(seconds, 6), **fields})
+
+    @contextmanager
+    def span(self, stage, **fields):
+        """Time the enclosed block as one `stage` span; an exception is logged with it and re-raised"""
+        start = time.perf_counter()
+        try:
+            yield fields
+        except BaseException as e:
+            fields['error'] = type(e).__name__
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, **fields)
+
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def stage_summary(self):
+        """{stage: {count, sum, max, p50, p90, p99}} for every stage seen"""
+        with self.lock:
+            durations = {stage: sorted(values) for stage, values in self.durations.items()}
+        return {
+            stage: {
+                'count': len(values),
+                'sum': sum(values),
+                'max': values[-1],
+                **{f'p{int(q * 100)}': _quantile(values, q) for q in QUANTILES}
+            }
+            for stage, values in durations.items()
+        }
+
+    def prometheus(self, success=True):
+        """The run's metrics in the Prometheus text exposition format"""
+        run = (('run', self.run or 'unknown'),)
+        lines = [
+            '# HELP limitless_stage_duration_seconds Time spent in each stage of the run',
+            '# TYPE limitless_stage_duration_seconds summary',
+        ]
+        for stage, stats in sorted(self.stage_summary().items()):
+            labels = run + (('stage', stage),)
+            for q in QUANTILES:
+                lines.append(
+                    f"limitless_stage_duration_seconds{_labels(labels + (('quantile', str(q)),))} "
+                    f"{stats[f'p{int(q * 100)}']:.6f}"
+                )
+            lines.append(f"limitless_stage_duration_seconds_sum{_labels(labels)} {stats['sum']:.6f}")
+            lines.append(f"limitless_stage_duration_seconds_count{_labels(labels)} {stats['count']}")
+
+        with self.lock:
+            counters = sorted(self.counters.items())
+        declared = set()
+        for (name, labels), value in counters:
+            metric = f"limitless_{name}_total"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f"{metric}{_labels(run + labels)} {value:g}")
+
+        lines += [
+            '# TYPE limitless_run_duration_seconds gauge',
+            f"limitless_run_duration_seconds{_labels(run)} {time.time() - self.started:.3f}",
+            '# TYPE limitless_run_success gauge',
+            f"limitless_run_success{_labels(run)} {int(bool(success))}",
+            '# TYPE limitless_run_finished_timestamp_seconds gauge',
+            f"limitless_run_finished_timestamp_seconds{_labels(run)} {time.time():.0f}",
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def finish(self, success=True, **fields):
+        """Log the run summary, write the textfile, print a timing table and start afresh"""
+        stages = self.stage_summary()
+        with self.lock:
+            counters = {
+                name + ''.join(f'[{k}={v}]' for k, v in labels): value
+                for (name, labels), value in self.counters.items()
+            }
+        self._write({'event': 'summary', 'success': success, 'seconds': round(time.time() - self.started, 3),
+                     'stages': stages, 'counters': counters, **fields})
+
+        if self.textfile:
+            fd, tmp_path = tempfile.mkstemp(dir=self.textfile.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.prometheus(success))
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.textfile)
+
+        if stages:
+            print(f"\n{'Stage':<14} {'Count':>6} {'Total s':>9} {'p50 ms':>8} {'p99 ms':>8} {'Max ms':>8}")
+            for stage, stats in sorted(stages.items(), key=lambda item: -item[1]['sum']):
+                print(f"{stage:<14} {stats['count']:>6} {stats['sum']:>9.2f} {stats['p50'] * 1000:>8.1f} "
+                      f"{stats['p99'] * 1000:>8.1f} {stats['max'] * 1000:>8.1f}")
+            if self.textfile:
+                print(f"Metrics written to {self.textfile}")
+        self.reset()
+
+
+METRICS = Metrics()
+span = METRICS.span
+count = METRICS.count
+
+
+@contextmanager
+def profiling(directory, label='run', top=40):
+    """
+    Run the enclosed block under cProfile and tracemalloc, then write
+    <label>-<timestamp>.pstats plus .txt reports into `directory`
+
+    Threads started inside the block (the fetch and write pools) are
+    profiled too; render worker processes are not. From Python 3.12 one
+    profiler sees every thread and a second one cannot be enabled, so only
+    older versions give each thread a profiler of its own to merge in.
+    """
+    # Only needed here, so ordinary runs do not pay for importing them
+    import cProfile
+    import io
+    import pstats
+    import tracemalloc
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    thread_profiles = []
+
+    per_thread = sys.version_info < (3, 12)
+
+    def profile_thread(*args):
+        # First profile event of a new thread: hand the thread over to its own cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active; leave the thread unprofiled rather than kill it
+            sys.setprofile(None)
+            return
+        thread_profiles.append(profiler)
+
+    main = cProfile.Profile()
+    tracemalloc.start(25)
+    if per_thread:
+        threading.setprofile(profile_thread)
+    main.enable()
+    try:
+        yield
+    finally:
+        main.disable()
+        if per_thread:
+            threading.setprofile(None)
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        stats = pstats.Stats(main)
+        for profiler in thread_profiles:
+            stats.add(profiler)
+        base = directory / f"{label}-{stamp}"
+        stats.dump_stats(f"{base}.pstats")
+        report = io.StringIO()
+        stats.stream = report
+        stats.sort_stats('cumulative').print_stats(top)
+        stats.sort_stats('tottime').print_stats(top)
+        Path(f"{base}-cpu.txt").write_text(report.getvalue(), encoding='utf-8')
+
+        lines = [f"Traced memory: current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB", '']
+        lines += [str(stat) for stat in snapshot.statistics('lineno')[:top]]
+        Path(f"{base}-memory.txt").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        print(f"Profile written to {base}.pstats ({base}-cpu.txt, {base}-memory.txt)")
@@ -0,0 +1,241 @@
+"""
+Direct Object-Database Writer
+Builds commits with `git fast-import` so large backfills never touch the
+worktree or re-hash the tree
+
+Notes are streamed into fast-import as blobs the moment they are rendered;
+a commit only lists the paths that changed. The index and worktree are
+brought up to date afterwards with a two-tree read-tree (only the changed
+paths are checked out); with update_worktree=False only the index is, and
+a bare clone in CI has neither.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from git import Actor
+
+from git_batcher import default_message
+from metrics import count, span
+
+
+class FastImportWriter:
+    """
+    Drop-in alternative to CommitBatcher that writes git objects directly
+
+    Supports the same add/commit/push/finish interface, plus write_note()
+    for rendered chunks that should never reach the worktree and
+    write_file() for a note rendered into a temp file.
+    """
+
+    def __init__(self, repo, max_days=None, max_bytes=None, update_worktree=True, on_commit=None):
+        self.repo = repo
+        self.root = Path(repo.working_tree_dir or repo.git_dir)
+        self.max_days = max_days
+        self.max_bytes = max_bytes
+        self.update_worktree = update_worktree and not repo.bare
+        self.on_commit = on_commit
+        self.branch = f"refs/heads/{repo.active_branch.name}"
+        self.start_sha = repo.head.commit.hexsha if repo.head.is_valid() else None
+        self.committer = Actor.committer(repo.config_reader())
+        # One ls-tree up front; GitPython's object reader is not safe to share across worker threads
+        self.existing = set(
+            repo.git.ls_tree('-r', '--name-only', self.start_sha).splitlines()
+        ) if self.start_sha else set()
+
+        self.pending = {}  # relative path -> (blob mark, label)
+        self.pending_bytes = 0
+        self.committed_labels = []  # reported to on_commit once fast-import has updated the ref
+        self.written = set()
+        self.superseded = set()  # worktree files queued with add() or remove(); read-tree puts them right
+        self.commits = 0
+        self.next_mark = 1
+        self.process = None
+        self.lock = threading.Lock()
+
+    def _start(self):
+        if self.process is None:
+            self.process = subprocess.Popen(
+                ['git', 'fast-import', '--quiet', '--done'],
+                cwd=self.repo.git_dir,
+                stdin=subprocess.PIPE
+            )
+
+    def _send(self, *parts):
+        for part in parts:
+            self.process.stdin.write(part.encode('utf-8') if isinstance(part, str) else part)
+
+    def _relative(self, path):
+        path = Path(path)
+        return (path.relative_to(self.root) if path.is_absolute() else path).as_posix()
+
+    def exists(self, rel_path):
+        """True if the path is already committed on the branch or queued in this run"""
+        rel_path = Path(rel_path).as_posix()
+        with self.lock:
+            if rel_path in self.pending:
+                return self.pending[rel_path][0] is not None
+            return rel_path in self.existing or rel_path in self.written
+
+    def write_note(self, rel_path, content, label=None):
+        """Stream rendered content (a string or chunks) into the object store"""
+        chunks = [content] if isinstance(content, str) else content
+        with span('write', path=Path(rel_path).name):
+            # fast-import needs the size before the data; spool the chunks
+            # rather than joining a whole day in memory
+            with tempfile.TemporaryFile(dir=self.repo.git_dir) as f:
+                for chunk in chunks:
+                    f.write(chunk.encode('utf-8'))
+                size = f.tell()
+                f.seek(0)
+                self._add_blob(Path(rel_path).as_posix(), f, label, size)
+        count('notes_written')
+        count('note_bytes', size)
+
+    def write_file(self, rel_path, path, label=None):
+        """Stream a rendered file into the object store without reading it into memory"""
+        with span('write', path=Path(rel_path).name):
+            size = os.path.getsize(path)
+            with open(path, 'rb') as f:
+                self._add_blob(Path(rel_path).as_posix(), f, label, size)
+        count('notes_written')
+        count('note_bytes', size)
+
+    def add(self, path, label=None):
+        """Queue a file that exists on disk (e.g. the sync state) as a blob"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        rel_path = self._relative(path)
+        self._add_blob(rel_path, data, label)
+        with self.lock:
+            self.superseded.add(rel_path)
+
+    def remove(self, path, label=None):
+        """Queue a file for deletion in the next commit"""
+        rel_path = self._relative(path)
+        with self.lock:
+            self.pending[rel_path] = (None, label)
+            self.superseded.add(rel_path)
+
+    def _add_blob(self, rel_path, data, label, size=None):
+        """Queue `data` (bytes, or a binary file of `size` bytes) as the blob for `rel_path`"""
+        size = len(data) if size is None else size
+        with self.lock:
+            self._start()
+            mark = self.next_mark
+            self.next_mark += 1
+            self._send(f"blob\nmark :{mark}\ndata {size}\n")
+            if isinstance(data, bytes):
+                self._send(data)
+            else:
+                shutil.copyfileobj(data, self.process.stdin, 64 * 1024)
+            self._send("\n")
+
+            if rel_path not in self.pending:
+                self.pending_bytes += size
+            self.pending[rel_path] = (mark, label)
+            full = (
+                (self.max_days and len(self.pending) >= self.max_days) or
+                (self.max_bytes and self.pending_bytes >= self.max_bytes)
+            )
+        if full:
+            self.commit()
+
+    def commit(self, message=None):
+        """Emit a commit for every pending blob; returns True if a commit was made"""
+        with self.lock:
+            if not self.pending:
+                return False
+            self._start()
+            message = message or default_message(label for _, label in self.pending.values())
+            message_bytes = message.encode('utf-8')
+
+            self._send(
+                f"commit {self.branch}\n",
+                f"committer {self.committer.name} <{self.committer.email}> {int(time.time())} +0000\n",
+                f"data {len(message_bytes)}\n", message_bytes, "\n"
+            )
+            if self.commits == 0 and self.start_sha:
+                self._send(f"from {self.start_sha}\n")
+            for rel_path, (mark, _) in sorted(self.pending.items()):
+                if mark is None:
+                    self._send(f"D {rel_path}\n")
+                else:
+                    self._send(f"M 100644 :{mark} {rel_path}\n")
+            self._send("\n")
+
+            print(f"Committed {len(self.pending)} file(s)")
+            count('git_commits')
+            for rel_path, (mark, _) in self.pending.items():
+                if mark is None:
+                    self.existing.discard(rel_path)
+                    self.written.discard(rel_path)
+                else:
+                    self.written.add(rel_path)
+            self.committed_labels.extend(label for _, label in self.pending.values() if label)
+            self.pending = {}
+            self.pending_bytes = 0
+            self.commits += 1
+            return True
+
+    def close(self):
+        """Finish the fast-import stream so the branch ref is updated"""
+        with self.lock:
+            if self.process is None:
+                return
+            with span('git_commit', mode='fast-import'):
+                self._send("done\n")
+                self.process.stdin.close()
+                code = self.process.wait()
+            self.process = None
+        if code != 0:
+            raise RuntimeError(f"git fast-import exited with status {code}")
+        if self.on_commit and self.committed_labels:
+            self.on_commit(self.committed_labels)
+        self.committed_labels = []
+
+        with span('git_checkout'):
+            if self.update_worktree:
+                # read-tree will not overwrite an untracked or modified file. Files queued
+                # from disk are identical to what was just committed and deleted ones are
+                # gone from HEAD, so clear them and let read-tree check out the result
+                for rel_path in self.superseded:
+                    (self.root / rel_path).unlink(missing_ok=True)
+                self.superseded.clear()
+            if not self.repo.bare:
+                # The index always follows HEAD, or the next commit made through it would
+                # undo this one; without -u the worktree is left as it was
+                update = ['-u'] if self.update_worktree else []
+                if self.start_sha:
+                    # Two-tree merge: only paths that differ are updated
+                    self.repo.git.read_tree('-m', *update, self.start_sha, 'HEAD')
+                else:
+                    self.repo.git.read_tree(*update, '--reset', 'HEAD')
+        self.start_sha = self.repo.head.commit.hexsha
+        self.existing.update(self.written)
+
+    def push(self):
+        if not self.commits:
+            print("No new changes to commit")
+            return False
+        print("Pushing to GitHub...")
+        with span('git_push'):
+            self.repo.remote('origin').push(self.branch)
+        print("✓ Successfully pushed to GitHub")
+        self.commits = 0
+        return True
+
+    def finish(self, message=None):
+        """Commit what is left, close fast-import, update the worktree and push"""
+        try:
+            self.commit(message)
+            self.close()
+            return self.push()
+        except Exception as e:
+            print(f"Git error: {e}")
+            return False
@@ -0,0 +1,143 @@
+"""
+Rate Limiting
+Token bucket and retry policy shared by every request to the Limitless API
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from settings import DEFAULT_RPS
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Callers reserve a token and sleep until it becomes valid, so waiting
+    requests queue up fairly instead of spinning. A rate of 0 or None
+    disables limiting entirely.
+    """
+
+    def __init__(self, rate=DEFAULT_RPS, burst=None, min_rate=0.2):
+        self.rate = float(rate) if rate else 0.0
+        self.target_rate = self.rate
+        self.min_rate = min(min_rate, self.rate) if self.rate else 0.0
+        self.capacity = float(burst) if burst else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take one token and return the number of seconds to wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            paused = max(0.0, self.paused_until - now)
+            if not self.rate:
+                return paused
+
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return paused
+            return max(paused, -self.tokens / self.rate)
+
+    def pause(self, seconds):
+        """
+        Hold back every caller for `seconds` and halve the rate
+
+        Called when the API throttles us, so all workers slow down together
+        instead of each one hammering the endpoint until it is throttled too.
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            if self.rate:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.tokens = min(self.tokens, 0.0)
+
+    def record_success(self):
+        """Step the rate back towards its configured target after a good response"""
+        if self.rate >= self.target_rate:
+            return
+        with self.lock:
+            self.rate = min(self.target_rate, self.rate + 0.1 * self.target_rate)
+
+    def acquire(self):
+        """Block the calling thread until a token is available"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def parse_retry_after(value):
+    """Convert a Retry-After header (seconds or HTTP date) to seconds, or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def parse_rate_limit_reset(headers):
+    """
+    Seconds until the X-RateLimit window resets when no requests remain
+
+    X-RateLimit-Reset is accepted either as a delta in seconds or as an
+    epoch timestamp.
+    """
+    if headers.get('X-RateLimit-Remaining') != '0':
+        return None
+    try:
+        reset = float(headers.get('X-RateLimit-Reset', ''))
+    except ValueError:
+        return None
+    if reset > 1e9:
+        reset -= time.time()
+    return max(0.0, reset)
+
+
+class RetryPolicy:
+    """
+    Decide whether and how long to wait before retrying a request
+
+    429 responses honour Retry-After and X-RateLimit-* headers; 5xx
+    responses and timeouts use exponential backoff with full jitter.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, max_attempts=5, base_delay=1.0, max_delay=60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def can_retry(self, attempt):
+        """True if another attempt is allowed after `attempt` (1-based) failed"""
+        return attempt < self.max_attempts
+
+    def should_retry(self, status_code):
+        return status_code in self.RETRY_STATUSES
+
+    def backoff(self, attempt):
+        """Jittered exponential delay for the given attempt"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def delay_for(self, attempt, response=None):
+        """Seconds to wait before retrying, preferring server-provided hints"""
+        if response is not None:
+            hint = parse_retry_after(response.headers.get('Retry-After'))
+            if hint is None:
+                hint = parse_rate_limit_reset(response.headers)
+            if hint is not None:
+                return hint
+        return self.backoff(attempt)
@@ -0,0 +1,450 @@
+"""
+Rendering
+Shared renderers for daily notes, used by the bulk importer, the daily sync
+and the GitHub Actions workflow
+
+Each output format is a Renderer subclass registered by name. Lifelog
+contents items are dispatched through a per-class table keyed by item type,
+built once when the class is defined, and every renderer yields small
+chunks that write_atomic streams straight to disk.
+"""
+
+import html
+import json
+import os
+import tempfile
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from metrics import count, span
+from timestamps import local_clocks
+
+RENDERERS = {}
+
+# Header/footer wording for each entry point
+STYLES = {
+    'import': {
+        'section': 'Lifelogs',
+        'time_label': 'Import Time',
+        'import_type': 'Bulk Historical Import',
+        'footer_label': 'Imported',
+        'closing': 'This note was bulk imported from Limitless historical data'
+    },
+    'sync': {
+        'section': 'Transcript',
+        'time_label': 'Time Generated',
+        'import_type': 'Daily Sync',
+        'footer_label': 'Sync Time',
+        'closing': 'This note was automatically generated and synced to GitHub'
+    }
+}
+
+
+def register_renderer(name):
+    """Class decorator adding a Renderer to the registry under `name`"""
+    def decorator(cls):
+        cls.name = name
+        cls.handlers = {
+            item_type: getattr(cls, method)
+            for item_type, method in cls.item_methods.items()
+        }
+        RENDERERS[name] = cls
+        return cls
+    return decorator
+
+
+def get_renderer(name):
+    try:
+        return RENDERERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown output format '{name}' (choose from {', '.join(sorted(RENDERERS))})")
+
+
+@lru_cache(maxsize=1024)
+def _parse_clock(timestamp):
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).strftime('%H:%M:%S')
+    except ValueError:
+        return None
+
+
+def clock_time(timestamp):
+    """HH:MM:SS for an ISO-8601 timestamp, or None if it cannot be parsed"""
+    # Well-formed API timestamps carry the wall-clock time at a fixed offset
+    if len(timestamp) >= 19 and timestamp[13] == ':' and timestamp[16] == ':' and timestamp[10] in 'T ':
+        return timestamp[11:19]
+    return _parse_clock(timestamp)
+
+
+def note_relpath(date_str, extension='.md'):
+    """year/MM-Month/YYYY-MM-DD-notes<ext> for a date"""
+    date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+    return Path(date_obj.strftime('%Y')) / date_obj.strftime('%m-%B') / f"{date_str}-notes{extension}"
+
+
+class Renderer:
+    """
+    Base class for output formats
+
+    Subclasses map lifelog item types to method names in `item_methods`;
+    anything not listed goes to `render_other`.
+    """
+
+    name = None
+    extension = ''
+    item_methods = {}
+    handlers = {}
+
+    def __init__(self, style='import', generated_at=None, timezone=None):
+        self.style = STYLES[style]
+        self.generated_at = generated_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.timezone = timezone
+        self.clocks = {}
+
+    def local_clock(self, timestamp):
+        """Local HH:MM:SS for a segment start time, or None"""
+        if not timestamp:
+            return None
+        clock = self.clocks.get(timestamp)
+        return clock if clock is not None else clock_time(timestamp)
+
+    def render(self, data, date):
+        """Yield the whole note for `date` (YYYY-MM-DD) as chunks"""
+        date_obj = datetime.strptime(date, '%Y-%m-%d')
+        yield self.header(date, date_obj)
+
+        if isinstance(data, list):
+            if self.timezone:
+                # Parse and convert every segment time for the day in one batch
+                self.clocks = local_clocks(data, self.timezone)
+            handlers = self.handlers
+            other = type(self).render_other
+            for idx, log in enumerate(data, 1):
+                yield self.lifelog_start(idx, log, date)
+                contents = log.get('contents')
+                if contents and isinstance(contents, list):
+                    for item in contents:
+                        yield handlers.get(item.get('type', ''), other)(self, item, idx, log, date)
+                yield self.lifelog_end(idx, log)
+        elif isinstance(data, dict):
+            yield from self.render_payload(data, date)
+        else:
+            yield self.render_raw(data)
+
+        yield self.footer(date)
+
+    def header(self, date, date_obj):
+        return ''
+
+    def footer(self, date):
+        return ''
+
+    def lifelog_start(self, idx, log, date):
+        return ''
+
+    def lifelog_end(self, idx, log):
+        return ''
+
+    def render_other(self, item, idx, log, date):
+        return ''
+
+    def render_payload(self, data, date):
+        yield self.render_raw(data)
+
+    def render_raw(self, data):
+        return str(data)
+
+
+@register_renderer('markdown')
+class MarkdownRenderer(Renderer):
+    extension = '.md'
+    item_methods = {
+        'heading1': 'render_heading1',
+        'heading2': 'render_heading2',
+        'blockquote': 'render_blockquote'
+    }
+
+    def header(self, date, date_obj):
+        return f"""# Daily Notes - {date_obj.strftime('%B %d, %Y')}
+
+**Date**: {date}
+**Day**: {date_obj.strftime('%A')}
+**{self.style['time_label']}**: {self.generated_at}
+
+---
+
+## {self.style['section']}
+
+"""
+
+    def footer(self, date):
+        return f"""
+
+---
+
+## Metadata
+
+- **Source**: Limitless Pendant
+- **Import Type**: {self.style['import_type']}
+- **API Version**: v1
+- **{self.style['footer_label']}**: {self.generated_at}
+
+---
+
+*{self.style['closing']}*
+"""
+
+    def lifelog_start(self, idx, log, date):
+        return f"\n### Lifelog {idx}\n"
+
+    def lifelog_end(self, idx, log):
+        return "\n---\n"
+
+    def render_heading1(self, item, idx, log, date):
+        return f"\n# {item.get('content', '')}\n"
+
+    def render_heading2(self, item, idx, log, date):
+        return f"\n## {item.get('content', '')}\n"
+
+    def render_blockquote(self, item, idx, log, date):
+        # Add speaker and time info if available
+        speaker = item.get('speakerName', 'Unknown')
+        time_str = self.local_clock(item.get('startTime'))
+        if time_str:
+            return f"\n**[{time_str}] {speaker}:**\n> {item.get('content', '')}\n"
+        return f"\n**{speaker}:**\n> {item.get('content', '')}\n"
+
+    def render_other(self, item, idx, log, date):
+        return f"\n{item.get('content', '')}\n"
+
+    def render_payload(self, data, date):
+        # If there are multiple conversations/events
+        if 'conversations' in data:
+            for idx, conversation in enumerate(data['conversations'], 1):
+                yield f"\n### Conversation {idx}\n"
+                if 'timestamp' in conversation:
+                    yield f"**Time**: {conversation['timestamp']}\n"
+                if 'duration' in conversation:
+                    yield f"**Duration**: {conversation['duration']}\n"
+                if 'participants' in conversation:
+                    yield f"**Participants**: {', '.join(conversation['participants'])}\n"
+                yield f"\n{conversation.get('text', conversation.get('transcript', ''))}\n\n"
+
+                # Add any tags or topics
+                if 'tags' in conversation:
+                    yield f"**Tags**: {', '.join(conversation['tags'])}\n\n"
+
+        # If there are events/activities
+        elif 'events' in data:
+            for idx, event in enumerate(data['events'], 1):
+                yield f"\n### Event {idx}\n"
+                yield f"**Type**: {event.get('type', 'Unknown')}\n"
+                yield f"**Time**: {event.get('timestamp', 'N/A')}\n\n"
+                yield f"{event.get('description', event.get('text', ''))}\n\n"
+
+        # If it's a single transcript
+        elif 'transcript' in data:
+            yield data['transcript']
+
+        # If it has daily summary
+        elif 'daily_summary' in data:
+            yield "### Daily Summary\n\n"
+            yield data['daily_summary']
+            yield "\n\n"
+
+            # Add any other fields
+            for key, value in data.items():
+                if key != 'daily_summary' and value:
+                    yield f"### {key.replace('_', ' ').title()}\n\n"
+                    if isinstance(value, (list, dict)):
+                        yield f"```json\n{json.dumps(value, indent=2)}\n```\n\n"
+                    else:
+                        yield f"{value}\n\n"
+
+        # Fallback: dump everything as JSON
+        else:
+            yield "### Raw Data\n\n"
+            yield "```json\n"
+            yield json.dumps(data, indent=2, default=str)
+            yield "\n```"
+
+        # Add statistics if available
+        stats = []
+        if 'word_count' in data:
+            stats.append(f"Words: {data['word_count']}")
+        if 'duration_minutes' in data:
+            stats.append(f"Duration: {data['duration_minutes']} min")
+        if 'conversation_count' in data:
+            stats.append(f"Conversations: {data['conversation_count']}")
+
+        if stats:
+            yield "\n---\n\n## Statistics\n\n"
+            yield " | ".join(stats)
+            yield "\n"
+
+
+@register_renderer('jsonl')
+class JSONLinesRenderer(Renderer):
+    """One JSON object per contents item, for loading into other tools"""
+
+    extension = '.jsonl'
+    item_methods = {
+        'heading1': 'render_segment',
+        'heading2': 'render_segment',
+        'blockquote': 'render_segment'
+    }
+
+    def render_segment(self, item, idx, log, date):
+        record = {
+            'date': date,
+            'lifelog_id': log.get('id'),
+            'lifelog_index': idx,
+            'type': item.get('type', ''),
+            'content': item.get('content', ''),
+            'speaker': item.get('speakerName'),
+            'start_time': item.get('startTime'),
+            'end_time': item.get('endTime')
+        }
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+    render_other = render_segment
+
+    def render_payload(self, data, date):
+        yield json.dumps({'date': date, 'payload': data}, ensure_ascii=False, default=str) + "\n"
+
+    def render_raw(self, data):
+        return json.dumps({'raw': str(data)}, ensure_ascii=False) + "\n"
+
+
+@register_renderer('html')
+class HTMLRenderer(Renderer):
+    extension = '.html'
+    item_methods = {
+        'heading1': 'render_heading1',
+        'heading2': 'render_heading2',
+        'blockquote': 'render_blockquote'
+    }
+
+    def header(self, date, date_obj):
+        title = f"Daily Notes - {date_obj.strftime('%B %d, %Y')}"
+        return (
+            "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<title>{title}</title>\n</head>\n<body>\n"
+            f"<h1>{title}</h1>\n"
+            f"<p><strong>Date</strong>: {date}<br>\n"
+            f"<strong>Day</strong>: {date_obj.strftime('%A')}<br>\n"
+            f"<strong>{self.style['time_label']}</strong>: {self.generated_at}</p>\n"
+            f"<h2>{self.style['section']}</h2>\n"
+        )
+
+    def footer(self, date):
+        return (
+            "<hr>\n<h2>Metadata</h2>\n<ul>\n"
+            "<li><strong>Source</strong>: Limitless Pendant</li>\n"
+            f"<li><strong>Import Type</strong>: {self.style['import_type']}</li>\n"
+            "<li><strong>API Version</strong>: v1</li>\n"
+            f"<li><strong>{self.style['footer_label']}</strong>: {self.generated_at}</li>\n"
+            f"</ul>\n<p><em>{self.style['closing']}</em></p>\n</body>\n</html>\n"
+        )
+
+    def lifelog_start(self, idx, log, date):
+        return f"<section>\n<h3>Lifelog {idx}</h3>\n"
+
+    def lifelog_end(self, idx, log):
+        return "</section>\n<hr>\n"
+
+    def render_heading1(self, item, idx, log, date):
+        return f"<h4>{html.escape(item.get('content', ''))}</h4>\n"
+
+    def render_heading2(self, item, idx, log, date):
+        return f"<h5>{html.escape(item.get('content', ''))}</h5>\n"
+
+    def render_blockquote(self, item, idx, log, date):
+        speaker = html.escape(item.get('speakerName', 'Unknown'))
+        time_str = self.local_clock(item.get('startTime'))
+        label = f"[{time_str}] {speaker}" if time_str else speaker
+        return f"<p><strong>{label}:</strong></p>\n<blockquote>{html.escape(item.get('content', ''))}</blockquote>\n"
+
+    def render_other(self, item, idx, log, date):
+        return f"<p>{html.escape(item.get('content', ''))}</p>\n"
+
+    def render_payload(self, data, date):
+        yield f"<pre>{html.escape(json.dumps(data, indent=2, default=str))}</pre>\n"
+
+    def render_raw(self, data):
+        return f"<pre>{html.escape(str(data))}</pre>\n"
+
+
+def iter_render(data, date, fmt='markdown', style='import', generated_at=None, timezone=None):
+    """
+    Yield the note for `date` in the given output format
+
+    With `timezone` set, segment times are shown in that zone; otherwise
+    they are shown as written in the API response (UTC).
+    """
+    renderer = get_renderer(fmt)(style=style, generated_at=generated_at, timezone=timezone)
+    return renderer.render(data, date)
+
+
+def iter_markdown(data, date, generated_at=None, style='import', timezone=None):
+    """Yield the daily note for `date` (YYYY-MM-DD) as markdown chunks"""
+    return iter_render(data, date, 'markdown', style=style, generated_at=generated_at, timezone=timezone)
+
+
+def render_to_file(data, date, directory, fmt='markdown', style='import', generated_at=None, timezone=None):
+    """
+    Stream a note into a new temp file in `directory` and return its path
+
+    Module-level so process pools can pickle it. Only the path goes back to
+    the caller, so a render worker never holds or pickles the whole note;
+    move_into_place() or FastImportWriter.write_file() takes it from there.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{date}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', buffering=64 * 1024) as f:
+            f.writelines(iter_render(data, date, fmt, style=style, generated_at=generated_at, timezone=timezone))
+        os.chmod(tmp_path, 0o644)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+
+def move_into_place(tmp_path, path):
+    """Rename a finished temp file (e.g. from render_to_file) to `path`"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with span('write', path=path.name):
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+    count('notes_written')
+    count('note_bytes', size)
+    return path
+
+
+def write_atomic(path, chunks):
+    """
+    Stream chunks into `path` through a temp file and rename it into place
+
+    The chunks go through writelines and the file object's own buffer, so
+    a huge day never has to be joined into one string, and readers (and
+    git) never observe a half-written note.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with span('write', path=path.name):
+            with os.fdopen(fd, 'w', encoding='utf-8', buffering=64 * 1024) as f:
+                f.writelines(chunks)
+            os.chmod(tmp_path, 0o644)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    count('notes_written')
+    count('note_bytes', size)
+    return path
@@ -0,0 +1,99 @@
+"""
+Notes Repository Setup
+Clones the notes repository shallow, blob-less and sparse so start-up cost
+does not grow with years of history, and fast-forwards existing clones
+
+A fresh clone holds one commit's trees (no file contents) and checks out
+only the top-level files. sparse_checkout_dates() then widens the checkout
+to just the year/month directories a run is about to write; their blobs
+are fetched on demand.
+
+A bare clone (--bare) has no worktree at all; the files the importer reads
+back, such as the content manifest, are copied out of HEAD with
+restore_from_head() instead.
+"""
+
+import os
+from pathlib import Path
+
+from git import GitCommandError, Repo
+
+from metrics import span
+from rendering import note_relpath
+from settings import DEFAULT_CLONE_DEPTH
+
+
+def open_repo(path, url, depth=DEFAULT_CLONE_DEPTH, partial=True, sparse=True, bare=False):
+    """
+    Clone `url` into `path`, or pull the latest changes into an existing clone
+
+    Args:
+        depth: Commits of history to clone (0 or None for all)
+        partial: Clone without file contents (--filter=blob:none)
+        sparse: Start with only top-level files checked out
+        bare: Clone without a worktree (notes are then written with fast-import)
+    """
+    if not os.path.exists(path):
+        print(f"Cloning repository to {path}")
+        options = {}
+        if depth:
+            options['depth'] = depth
+        if partial:
+            options['filter'] = 'blob:none'
+        if bare:
+            options['bare'] = True
+        elif sparse:
+            options['sparse'] = True
+        with span('git_clone'):
+            return Repo.clone_from(url, path, **options)
+
+    print("Repository already exists, pulling latest changes")
+    return pull_repo(Repo(path))
+
+
+def pull_repo(repo):
+    """Bring an open clone up to date with its origin; returns the repo"""
+    origin = repo.remote('origin')
+    # A plain fetch into a shallow clone only transfers the new commits
+    with span('git_pull'):
+        if repo.bare:
+            # No worktree to merge into; fast-forward the branch ref directly
+            branch = repo.active_branch.name
+            origin.fetch(f"{branch}:{branch}")
+        else:
+            origin.pull()
+    return repo
+
+
+def restore_from_head(repo, names):
+    """Copy top-level files out of HEAD into a bare clone's directory, where the importer reads them"""
+    if not repo.bare or not repo.head.is_valid():
+        return
+    tree = repo.head.commit.tree
+    for name in names:
+        try:
+            blob = tree / name
+        except KeyError:
+            continue
+        # HEAD is the source of truth; a copy left by an earlier run may be stale
+        with open(Path(repo.git_dir) / name, 'wb') as f:
+            blob.stream_data(f)
+
+
+def is_sparse(repo):
+    """True if the worktree is a sparse checkout"""
+    if repo.bare:
+        return False
+    try:
+        return repo.git.config('--get', '--bool', 'core.sparseCheckout') == 'true'
+    except GitCommandError:
+        return False
+
+
+def sparse_checkout_dates(repo, dates, extension='.md'):
+    """Limit a sparse checkout to the year/month directories holding `dates`"""
+    if not dates or not is_sparse(repo):
+        return
+    dirs = sorted({Path(note_relpath(date, extension)).parent.as_posix() for date in dates})
+    print(f"Sparse checkout: {', '.join(dirs)}")
+    repo.git.sparse_checkout('set', *dirs)
@@ -0,0 +1,162 @@
+"""
+Response Cache
+On-disk cache of raw /lifelogs responses with conditional revalidation
+
+Layout under the cache directory:
+    objects/ab/<sha256>.json  - one raw lifelog, content addressed
+    pages/<sha256>.json       - one page of a date window: the request params,
+                                validators (ETag/Last-Modified), the cursor to
+                                the next page and the (lifelog id, hash) pairs
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from segments import to_plain
+from settings import DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE_MB
+
+
+def _atomic_write(path, data):
+    """Write bytes to path via a temp file so readers never see partial files"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class CachedPage:
+    def __init__(self, lifelogs, next_cursor, etag=None, last_modified=None):
+        self.lifelogs = lifelogs
+        self.next_cursor = next_cursor
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def conditional_headers(self):
+        """Headers that let the server answer 304 if the page is unchanged"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_size_mb=DEFAULT_CACHE_SIZE_MB):
+        self.root = Path(cache_dir)
+        self.objects_dir = self.root / 'objects'
+        self.pages_dir = self.root / 'pages'
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.lock = threading.Lock()
+        self.size = sum(f.stat().st_size for f in self._files())
+
+    def _files(self):
+        for directory in (self.objects_dir, self.pages_dir):
+            if directory.exists():
+                yield from (f for f in directory.rglob('*.json') if f.is_file())
+
+    @staticmethod
+    def page_key(params):
+        """Stable key for a window + cursor, ignoring parameter order"""
+        canonical = json.dumps(params, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _object_path(self, digest):
+        return self.objects_dir / digest[:2] / f"{digest}.json"
+
+    def _page_path(self, params):
+        return self.pages_dir / f"{self.page_key(params)}.json"
+
+    def _store(self, path, data):
+        existing = path.stat().st_size if path.exists() else 0
+        _atomic_write(path, data)
+        with self.lock:
+            self.size += len(data) - existing
+            over_budget = self.size > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def _load(self, path):
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # Mark as recently used for eviction
+        return json.loads(data)
+
+    def get_page(self, params):
+        """Return the CachedPage for these params, or None on a miss"""
+        entry = self._load(self._page_path(params))
+        if entry is None:
+            return None
+
+        lifelogs = []
+        for ref in entry['lifelogs']:
+            lifelog = self._load(self._object_path(ref['hash']))
+            if lifelog is None:
+                # An object was evicted; treat the page as a miss
+                return None
+            lifelogs.append(lifelog)
+
+        return CachedPage(
+            lifelogs,
+            entry.get('next_cursor'),
+            etag=entry.get('etag'),
+            last_modified=entry.get('last_modified')
+        )
+
+    def put_page(self, params, lifelogs, next_cursor, headers=None):
+        """Store a freshly fetched page and its lifelogs"""
+        headers = headers or {}
+        refs = []
+        for lifelog in lifelogs:
+            data = json.dumps(to_plain(lifelog), sort_keys=True, separators=(',', ':')).encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()
+            path = self._object_path(digest)
+            if path.exists():
+                os.utime(path)
+            else:
+                self._store(path, data)
+            refs.append({'id': lifelog.get('id'), 'hash': digest})
+
+        entry = {
+            'params': params,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'next_cursor': next_cursor,
+            'lifelogs': refs,
+            'fetched_at': time.time()
+        }
+        self._store(self._page_path(params), json.dumps(entry).encode('utf-8'))
+
+    def evict(self):
+        """Delete least recently used files until the cache is back under 90% of its budget"""
+        target = self.max_bytes * 0.9
+        with self.lock:
+            files = []
+            for f in self._files():
+                try:
+                    stat = f.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, f))
+            self.size = sum(size for _, size, _ in files)
+
+            for _, size, f in sorted(files):
+                if self.size <= target:
+                    break
+                try:
+                    f.unlink()
+                except FileNotFoundError:
+                    continue
+                self.size -= size
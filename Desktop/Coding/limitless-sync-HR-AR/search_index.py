@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Transcript Search Index
+SQLite FTS5 index over lifelog segments, updated day by day as notes are
+written, with a `search` command for ranked, date-filtered lookups
+
+Usage:
+    python3 search_index.py search "quarterly budget"
+    python3 search_index.py search "budget" --since 2024-01-01 --until 2024-03-31 --speaker You
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from cli_args import add_search_arguments
+from settings import DEFAULT_SEARCH_DB
+from timestamps import local_clocks
+
+
+HEADING_TYPES = {'heading1', 'heading2'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    date TEXT PRIMARY KEY,
+    hash TEXT,
+    indexed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    lifelog_id TEXT,
+    heading TEXT,
+    speaker TEXT,
+    start_time TEXT,
+    clock TEXT,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_date ON segments (date);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, speaker, heading,
+    content='segments', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts (rowid, text, speaker, heading)
+    VALUES (new.id, new.text, new.speaker, new.heading);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts (segments_fts, rowid, text, speaker, heading)
+    VALUES ('delete', old.id, old.text, old.speaker, old.heading);
+END;
+"""
+
+
+def iter_segments(lifelogs, clocks=None):
+    """
+    Yield (lifelog id, heading, speaker, startTime, clock, text) for every
+    non-heading item, carrying the most recent heading (or the lifelog
+    title) along as context
+    """
+    clocks = clocks or {}
+    for log in lifelogs:
+        heading = log.get('title')
+        for item in log.get('contents') or []:
+            text = item.get('content')
+            if not text:
+                continue
+            if item.get('type') in HEADING_TYPES:
+                heading = text
+                continue
+            start_time = item.get('startTime')
+            clock = clocks.get(start_time) if start_time else None
+            if clock is None and start_time:
+                clock = start_time[11:19]
+            yield log.get('id'), heading, item.get('speakerName'), start_time, clock, text
+
+
+def fts_query(text):
+    """Quote each word so plain text never trips over FTS5 operators"""
+    return ' '.join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+class SearchIndex:
+    """
+    Segment-level full-text index of the daily notes
+
+    index_day() replaces one day's segments in a single transaction and is
+    a no-op when the day was last indexed from content with the same hash.
+    """
+
+    def __init__(self, path=DEFAULT_SEARCH_DB, timezone=None):
+        self.path = path
+        self.timezone = timezone
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+
+    def indexed_hash(self, date):
+        with self.lock:
+            row = self.db.execute('SELECT hash FROM days WHERE date = ?', (date,)).fetchone()
+        return row[0] if row else None
+
+    def index_day(self, date, lifelogs, digest=None):
+        """Replace the segments for `date`; returns the number indexed, or None if unchanged"""
+        if digest and self.indexed_hash(date) == digest:
+            return None
+        clocks = local_clocks(lifelogs, self.timezone) if self.timezone else None
+        rows = [(date, *segment) for segment in iter_segments(lifelogs, clocks)]
+
+        with self.lock:
+            self.db.execute('BEGIN')
+            self.db.execute('DELETE FROM segments WHERE date = ?', (date,))
+            self.db.executemany(
+                """INSERT INTO segments (date, lifelog_id, heading, speaker, start_time, clock, text)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                rows
+            )
+            self.db.execute(
+                'INSERT OR REPLACE INTO days (date, hash, indexed_at) VALUES (?, ?, ?)',
+                (date, digest, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            )
+            self.db.execute('COMMIT')
+        return len(rows)
+
+    def search(self, query, since=None, until=None, speaker=None, limit=20, raw=False):
+        """
+        Best-ranked segments matching `query` (BM25, text weighted above speaker and heading)
+
+        `query` is plain words unless `raw` is set, in which case it is
+        passed to FTS5 as-is (phrases, OR, NEAR, prefix*).
+        """
+        sql = """
+            SELECT s.date, s.clock, s.speaker, s.heading, s.lifelog_id,
+                   snippet(segments_fts, 0, '[', ']', '…', 16) AS snippet,
+                   bm25(segments_fts, 1.0, 0.5, 0.3) AS rank
+            FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid
+            WHERE segments_fts MATCH ?
+        """
+        params = [query if raw else fts_query(query)]
+        if since:
+            sql += ' AND s.date >= ?'
+            params.append(since)
+        if until:
+            sql += ' AND s.date <= ?'
+            params.append(until)
+        if speaker:
+            sql += ' AND s.speaker = ?'
+            params.append(speaker)
+        sql += ' ORDER BY rank LIMIT ?'
+        params.append(limit)
+
+        with self.lock:
+            cursor = self.db.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def stats(self):
+        """Days and segments indexed, and the first and last date"""
+        with self.lock:
+            days, first, last = self.db.execute('SELECT COUNT(*), MIN(date), MAX(date) FROM days').fetchone()
+            segments = self.db.execute('SELECT COUNT(*) FROM segments').fetchone()[0]
+        return {'days': days, 'segments': segments, 'first_date': first, 'last_date': last}
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search the local transcript index')
+    parser.add_argument('--db', default=DEFAULT_SEARCH_DB, help=f'Index database (default: {DEFAULT_SEARCH_DB})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    search = commands.add_parser('search', help='Full-text search over transcript segments')
+    # Shared with `limitless_sync.py search` (cli_args.py)
+    add_search_arguments(search)
+    run_search(parser.parse_args())
+
+
+def run_search(args):
+    """Print the hits for a parsed search command"""
+    if not os.path.exists(args.db):
+        print(f"No search index at {args.db} - run an import or sync first")
+        return
+
+    index = SearchIndex(args.db)
+    try:
+        start = time.perf_counter()
+        try:
+            hits = index.search(args.query, args.since, args.until, args.speaker, args.limit, args.raw)
+        except sqlite3.OperationalError as e:
+            print(f"Invalid query: {e}")
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        # An empty result is only meaningful next to what the index covers
+        stats = index.stats() if not hits else None
+    finally:
+        index.close()
+
+    for hit in hits:
+        when = f"{hit['date']} {hit['clock'] or ''}".strip()
+        print(f"{when}  {hit['speaker'] or 'Unknown'}  ({hit['heading'] or 'untitled'})")
+        print(f"    {hit['snippet']}")
+    print(f"\n{len(hits)} result(s) in {elapsed:.1f} ms")
+    if stats is not None:
+        print(f"Searched {stats['segments']} segment(s) from {stats['days']} day(s)"
+              + (f", {stats['first_date']} to {stats['last_date']}" if stats['days'] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Lifelog Segments
+Compact in-memory model for lifelogs and their contents items
+
+A parsed API dict spends most of its memory on per-item hash tables and on
+repeated copies of the same speaker names and type strings. Here each item
+is a __slots__ object, speaker names are interned and types are a small
+enum, so a year of history can be bucketed in a fraction of the memory.
+
+Both classes answer get() and [] with the API's own key names, so the
+renderers, hashing and indexing code read them exactly like the original
+dicts; to_dict() gives back the dict the API sent.
+"""
+
+import sys
+from enum import IntEnum
+
+
+class SegmentType(IntEnum):
+    HEADING1 = 1
+    HEADING2 = 2
+    HEADING3 = 3
+    BLOCKQUOTE = 4
+    PARAGRAPH = 5
+
+
+TYPE_NAMES = {t: t.name.lower() for t in SegmentType}
+TYPES_BY_NAME = {name: t for t, name in TYPE_NAMES.items()}
+
+
+class _Missing:
+    """Marks a key the API did not send; pickles back to the same object"""
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return 'MISSING'
+
+    def __repr__(self):
+        return 'MISSING'
+
+
+MISSING = _Missing()
+NO_CHILDREN = ()
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _Record:
+    """Dict-style read access over the slots named in FIELDS ((api key, attribute) pairs)"""
+
+    __slots__ = ()
+    FIELDS = ()
+    ATTRS = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.ATTRS = dict(cls.FIELDS)
+
+    def _value(self, key):
+        attr = self.ATTRS.get(key)
+        if attr is None:
+            return self.extra.get(key, MISSING) if self.extra else MISSING
+        return getattr(self, attr)
+
+    def get(self, key, default=None):
+        # Inlined _value(): this is on the per-item rendering path
+        attr = self.ATTRS.get(key)
+        if attr is None:
+            value = self.extra.get(key, MISSING) if self.extra else MISSING
+        else:
+            value = getattr(self, attr)
+        return default if value is MISSING else value
+
+    def __getitem__(self, key):
+        value = self._value(key)
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self._value(key) is not MISSING
+
+    def keys(self):
+        return [key for key, attr in self.FIELDS if getattr(self, attr) is not MISSING] + list(self.extra or ())
+
+    def to_dict(self):
+        """The item as the API sent it"""
+        return {key: to_plain(self.get(key)) for key in self.keys()}
+
+    def __reduce__(self):
+        return _restore, (type(self), tuple(getattr(self, slot) for slot in self.__slots__))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Segment(_Record):
+    """One contents item (heading, blockquote, ...) of a lifelog"""
+
+    __slots__ = ('type', 'content', 'speaker', 'speaker_id', 'start_time', 'end_time',
+                 'start_offset_ms', 'end_offset_ms', 'children', 'extra')
+    FIELDS = (
+        ('type', 'type_name'),
+        ('content', 'content'),
+        ('speakerName', 'speaker'),
+        ('speakerIdentifier', 'speaker_id'),
+        ('startTime', 'start_time'),
+        ('endTime', 'end_time'),
+        ('startOffsetMs', 'start_offset_ms'),
+        ('endOffsetMs', 'end_offset_ms'),
+        ('children', 'children'),
+    )
+
+    @classmethod
+    def from_dict(cls, data):
+        seg = cls.__new__(cls)
+        data = dict(data)
+        kind = data.pop('type', MISSING)
+        seg.type = TYPES_BY_NAME.get(kind, _intern(kind)) if isinstance(kind, str) else kind
+        seg.content = data.pop('content', MISSING)
+        seg.speaker = _intern(data.pop('speakerName', MISSING))
+        seg.speaker_id = _intern(data.pop('speakerIdentifier', MISSING))
+        seg.start_time = data.pop('startTime', MISSING)
+        seg.end_time = data.pop('endTime', MISSING)
+        seg.start_offset_ms = data.pop('startOffsetMs', MISSING)
+        seg.end_offset_ms = data.pop('endOffsetMs', MISSING)
+        children = data.pop('children', MISSING)
+        if isinstance(children, list):
+            children = tuple(cls.from_dict(c) if isinstance(c, dict) else c for c in children) or NO_CHILDREN
+        seg.children = children
+        seg.extra = data or None
+        return seg
+
+    @property
+    def type_name(self):
+        """The type as the API spells it"""
+        kind = self.type
+        return TYPE_NAMES[kind] if isinstance(kind, SegmentType) else kind
+
+
+class Lifelog(_Record):
+    """One lifelog (a conversation) and its contents as Segments"""
+
+    __slots__ = ('id', 'title', 'markdown', 'start_time', 'end_time', 'is_starred',
+                 'updated_at', 'contents', 'extra')
+    FIELDS = (
+        ('id', 'id'),
+        ('title', 'title'),
+        ('markdown', 'markdown'),
+        ('startTime', 'start_time'),
+        ('endTime', 'end_time'),
+        ('isStarred', 'is_starred'),
+        ('updatedAt', 'updated_at'),
+        ('contents', 'contents'),
+    )
+
+    @classmethod
+    def from_dict(cls, data):
+        log = cls.__new__(cls)
+        data = dict(data)
+        log.id = data.pop('id', MISSING)
+        log.title = data.pop('title', MISSING)
+        log.markdown = data.pop('markdown', MISSING)
+        log.start_time = data.pop('startTime', MISSING)
+        log.end_time = data.pop('endTime', MISSING)
+        log.is_starred = data.pop('isStarred', MISSING)
+        log.updated_at = data.pop('updatedAt', MISSING)
+        contents = data.pop('contents', MISSING)
+        if isinstance(contents, list):
+            contents = [Segment.from_dict(item) if isinstance(item, dict) else item for item in contents]
+        log.contents = contents
+        log.extra = data or None
+        return log
+
+
+def _restore(cls, values):
+    """Unpickle a record, re-interning its speaker names in this process"""
+    record = cls.__new__(cls)
+    for slot, value in zip(cls.__slots__, values):
+        setattr(record, slot, _intern(value) if slot in ('speaker', 'speaker_id') else value)
+    return record
+
+
+def parse_lifelogs(lifelogs):
+    """Convert a page of API dicts to Lifelogs, leaving anything already converted as-is"""
+    return [Lifelog.from_dict(log) if isinstance(log, dict) else log for log in lifelogs]
+
+
+def to_plain(value):
+    """Recursively turn Lifelogs and Segments back into plain dicts and lists"""
+    if isinstance(value, _Record):
+        return value.to_dict()
+    if isinstance(value, (list, tuple)):
+        return [to_plain(v) for v in value]
+    return value
@@ -0,0 +1,52 @@
+"""
+Settings
+Environment-derived configuration and the defaults shared by the importer,
+the daily sync and the command line
+
+Nothing here imports a third-party package, so limitless_sync.py can build
+its help and plan a --dry-run without loading requests, GitPython, NumPy or
+pyarrow. The modules that use a default re-export it under the same name.
+"""
+
+import os
+
+# Account
+LIMITLESS_API_KEY = os.environ.get('LIMITLESS_API_KEY', 'your-api-key-here')
+GITHUB_TOKEN = os.environ.get('GITHUB_TOKEN', 'your-github-token-here')
+GITHUB_USERNAME = os.environ.get('GITHUB_USERNAME', 'HR-AR')
+TIMEZONE = os.environ.get('TIMEZONE', 'America/Los_Angeles')
+REPO_NAME = 'limitless-notes'
+LOCAL_REPO_PATH = os.path.expanduser(f'~/Documents/{REPO_NAME}')
+
+# Overridable so benchmarks can run against benchmarks/mock_api.py and a local bare remote
+DEFAULT_BASE_URL = "https://api.limitless.ai/v1"
+API_URL = os.environ.get('LIMITLESS_API_URL', DEFAULT_BASE_URL)
+REMOTE_URL = os.environ.get('LIMITLESS_REMOTE_URL') or f"https://{GITHUB_TOKEN}@github.com/{GITHUB_USERNAME}/{REPO_NAME}.git"
+
+# Network
+DEFAULT_RPS = 3.0  # Limitless allows roughly 180 requests per minute per key
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+
+# Local state
+DEFAULT_CACHE_DIR = os.path.expanduser(
+    os.environ.get('LIMITLESS_CACHE_DIR', '~/.cache/limitless-sync')
+)
+DEFAULT_CACHE_SIZE_MB = 512
+DEFAULT_SEARCH_DB = os.environ.get('LIMITLESS_SEARCH_DB', os.path.join(DEFAULT_CACHE_DIR, 'search.sqlite'))
+DEFAULT_ARCHIVE_DIR = os.environ.get('LIMITLESS_ARCHIVE_DIR', os.path.join(DEFAULT_CACHE_DIR, 'archive'))
+DEFAULT_METRICS_DIR = os.environ.get('LIMITLESS_METRICS_DIR', os.path.join(DEFAULT_CACHE_DIR, 'metrics'))
+
+# Notes repository; a clone depth of 0 clones the full history
+DEFAULT_CLONE_DEPTH = int(os.environ.get('LIMITLESS_CLONE_DEPTH', '1'))
+
+# Bulk importer pipeline
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RENDER_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_QUEUE_SIZE = 16
+
+# Continuous and multi-account sync
+DEFAULT_INTERVAL_MINUTES = float(os.environ.get('LIMITLESS_SYNC_INTERVAL', '10'))
+DEFAULT_JITTER_SECONDS = float(os.environ.get('LIMITLESS_SYNC_JITTER', '30'))
+DEFAULT_ACCOUNTS_FILE = os.environ.get('LIMITLESS_ACCOUNTS', 'accounts.json')
+DEFAULT_ACCOUNT_CONCURRENCY = 4
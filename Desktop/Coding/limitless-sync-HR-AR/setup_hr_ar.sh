@@ -62,7 +62,7 @@ echo "✓ Python installed"
 # Install dependencies
 echo ""
 echo "Installing Python dependencies..."
-pip3 install requests GitPython schedule python-dotenv --quiet
+pip3 install requests GitPython python-dotenv --quiet
 echo "✓ Dependencies installed"
 
 # Initialize Git repository
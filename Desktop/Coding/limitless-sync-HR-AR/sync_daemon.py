@@ -0,0 +1,136 @@
+"""
+Sync Daemon
+Runs a sync job on a jittered interval from an asyncio event loop, keeping
+whatever the job holds (HTTP session, repository handle) warm between runs
+
+The job runs on a single worker thread, so runs never overlap. A trigger
+that arrives while a run is in progress - the timer, SIGHUP or trigger() -
+is coalesced into one follow-up run instead of queueing a run per trigger.
+SIGINT and SIGTERM let the current run finish and then stop the daemon.
+"""
+
+import asyncio
+import random
+import signal
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from metrics import count
+from settings import DEFAULT_INTERVAL_MINUTES, DEFAULT_JITTER_SECONDS
+
+
+class SyncDaemon:
+    """
+    Call `job` every `interval` minutes, +/- up to `jitter` seconds
+
+    Args:
+        job: Blocking callable run on the worker thread; exceptions are
+             printed and the daemon carries on
+        run_now: Run once at start-up instead of waiting for the first interval
+    """
+
+    def __init__(self, job, interval=DEFAULT_INTERVAL_MINUTES, jitter=DEFAULT_JITTER_SECONDS,
+                 run_now=True, name='sync'):
+        self.job = job
+        self.interval = interval * 60
+        self.jitter = min(jitter, self.interval / 2)
+        self.run_now = run_now
+        self.name = name
+        self.runs = 0
+        self.coalesced = 0
+        self.running = False
+        self.stopping = False
+        self.loop = None
+        self.wake = None
+
+    def next_delay(self):
+        """Seconds until the next timed run"""
+        return max(0.0, self.interval + random.uniform(-self.jitter, self.jitter))
+
+    def trigger(self, reason='manual'):
+        """Ask for a run as soon as possible; safe to call from any thread"""
+        if self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self._trigger, reason)
+
+    def _trigger(self, reason):
+        count('sync_triggers', reason=reason)
+        if self.running or self.wake.is_set():
+            # Already running or already due: fold this into the pending run
+            self.coalesced += 1
+            count('sync_triggers_coalesced', reason=reason)
+            print(f"Sync requested ({reason}); one follow-up run is queued")
+        else:
+            print(f"Sync requested ({reason})")
+        self.wake.set()
+
+    def stop(self, reason='stop'):
+        if self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self._stop, reason)
+
+    def _stop(self, reason):
+        if not self.stopping:
+            waiting = " after the current run" if self.running else ""
+            print(f"Stopping {self.name} daemon ({reason}){waiting}")
+        self.stopping = True
+        self.wake.set()
+
+    def install_signal_handlers(self):
+        """SIGHUP syncs now, SIGINT/SIGTERM stop; signal handlers are unavailable on Windows"""
+        handlers = [(signal.SIGINT, self._stop, 'SIGINT'), (signal.SIGTERM, self._stop, 'SIGTERM')]
+        if hasattr(signal, 'SIGHUP'):
+            handlers.append((signal.SIGHUP, self._trigger, 'SIGHUP'))
+        for signum, handler, reason in handlers:
+            try:
+                self.loop.add_signal_handler(signum, handler, reason)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+    async def _wait(self, delay):
+        """Sleep until the timer fires or a trigger/stop arrives"""
+        try:
+            await asyncio.wait_for(self.wake.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            count('sync_triggers', reason='timer')
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        self.wake = asyncio.Event()
+        self.install_signal_handlers()
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.name) as worker:
+            if self.run_now:
+                self.wake.set()
+
+            while not self.stopping:
+                if not self.wake.is_set():
+                    delay = self.next_delay()
+                    next_run = datetime.now() + timedelta(seconds=delay)
+                    print(f"Next {self.name} at {next_run.strftime('%Y-%m-%d %H:%M:%S')} "
+                          f"(SIGHUP to sync now, Ctrl+C to stop)")
+                    await self._wait(delay)
+                if self.stopping:
+                    break
+                # Triggers from here on queue exactly one more run
+                self.wake.clear()
+                self.running = True
+                try:
+                    await self.loop.run_in_executor(worker, self.job)
+                except Exception:
+                    print(f"{self.name} failed; retrying at the next interval")
+                    traceback.print_exc()
+                finally:
+                    self.running = False
+                    self.runs += 1
+
+        print(f"{self.name} daemon stopped after {self.runs} run(s), {self.coalesced} coalesced trigger(s)")
+
+    def serve(self):
+        """Run the daemon until SIGINT/SIGTERM"""
+        try:
+            asyncio.run(self.run())
+        except KeyboardInterrupt:
+            # Only reached where signal handlers could not be installed
+            print(f"\n{self.name} daemon interrupted")
@@ -0,0 +1,105 @@
+"""
+Sync State
+High-water mark of what has already been ingested, persisted as
+.sync_state.json in the notes repository
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from timestamps import local_now
+
+STATE_FILENAME = '.sync_state.json'
+
+
+class SyncState:
+    """
+    Per-day record of the lifelogs already written
+
+    `days` maps a local date (YYYY-MM-DD) to {lifelog id: updatedAt}. A day
+    only needs rewriting when that mapping changes: a new lifelog, an edited
+    one (newer updatedAt) or a deleted one. A day whose lifelogs were all
+    deleted has no bucket at all; its note should be removed and the day
+    forgotten.
+    """
+
+    def __init__(self, repo_path):
+        self.path = Path(repo_path) / STATE_FILENAME
+        self.days = {}
+        self.last_date = None
+        self.last_synced = None
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        self.days = state.get('days', {})
+        self.last_date = state.get('last_date')
+        self.last_synced = state.get('last_synced')
+
+    def save(self):
+        """Write the state atomically so an interrupted run never corrupts it"""
+        self.last_synced = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        state = {
+            'last_date': self.last_date,
+            'last_synced': self.last_synced,
+            'days': dict(sorted(self.days.items()))
+        }
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+            f.write('\n')
+        os.replace(tmp_path, self.path)
+
+    def window_start(self, lookback_days=1, timezone=None):
+        """
+        First date that must be re-fetched
+
+        Starts `lookback_days` before the newest day already ingested so
+        late uploads and edits to recent lifelogs are still picked up;
+        before the first sync, before today in `timezone`.
+        """
+        if self.last_date:
+            anchor = datetime.strptime(self.last_date, '%Y-%m-%d')
+        else:
+            anchor = local_now(timezone)
+        return (anchor - timedelta(days=lookback_days)).strftime('%Y-%m-%d')
+
+    @staticmethod
+    def fingerprint(lifelogs):
+        return {
+            str(log.get('id')): log.get('updatedAt') or log.get('endTime') or ''
+            for log in lifelogs
+        }
+
+    def changed_days(self, buckets, start=None, end=None):
+        """
+        Return the dates whose lifelogs differ from what was last written
+
+        With the fetched window's `start` and `end` dates, days inside it
+        that were written before but have no bucket now are included too.
+        """
+        changed = {
+            date for date, lifelogs in buckets.items()
+            if self.fingerprint(lifelogs) != self.days.get(date)
+        }
+        if start and end:
+            changed.update(
+                date for date, written in self.days.items()
+                if written and start <= date <= end and date not in buckets
+            )
+        return sorted(changed)
+
+    def forget(self, date):
+        """Drop a day whose lifelogs are all gone"""
+        self.days.pop(date, None)
+
+    def record(self, date, lifelogs):
+        """Mark a day as written with the given lifelogs"""
+        self.days[date] = self.fingerprint(lifelogs)
+        if not self.last_date or date > self.last_date:
+            self.last_date = date
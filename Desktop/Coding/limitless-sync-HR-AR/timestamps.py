@@ -0,0 +1,151 @@
+"""
+Timestamps
+Batch parsing of lifelog startTime/endTime values and conversion to the
+configured timezone
+
+A whole page (or day) of ISO-8601 strings is parsed at once - through NumPy
+datetime64 when it is installed - and converted to local day keys and
+HH:MM:SS strings. The zone offset is looked up once per distinct UTC hour
+rather than once per timestamp.
+"""
+
+from datetime import date, datetime, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+MS_PER_HOUR = 3_600_000
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+_numpy = None
+
+
+def numpy_module():
+    """NumPy, or None when it is not installed"""
+    # Imported on first use, so commands that never parse a timestamp skip its ~60 ms import
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:  # NumPy is optional; the pure-Python path gives identical results
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def _parse_one(value):
+    """Epoch milliseconds for one ISO-8601 string, or None"""
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=dt_timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def parse_epoch_ms(values):
+    """
+    Parse a batch of ISO-8601 timestamps to epoch milliseconds
+
+    Returns a list aligned with `values`; entries that are empty or cannot
+    be parsed are None.
+    """
+    result = [None] * len(values)
+
+    np = numpy_module()
+    if np is not None:
+        # datetime64 only understands UTC strings without an offset suffix
+        utc = [i for i, v in enumerate(values) if v and v[-1] == 'Z']
+        if utc:
+            try:
+                parsed = np.array([values[i][:-1] for i in utc], dtype='datetime64[ms]')
+                for i, ms in zip(utc, parsed.astype('int64').tolist()):
+                    result[i] = ms
+            except ValueError:
+                pass  # One malformed value; fall back to per-item parsing below
+
+    for i, value in enumerate(values):
+        if result[i] is None and value:
+            result[i] = _parse_one(value)
+    return result
+
+
+def _hour_offsets(hours, tz):
+    """UTC offset in seconds for the start of each distinct UTC hour"""
+    return {
+        hour: int(datetime.fromtimestamp(hour * 3600, tz).utcoffset().total_seconds())
+        for hour in hours
+    }
+
+
+def localize_epoch_ms(epoch_ms, tz_name):
+    """
+    Convert epoch milliseconds to (day keys, clock strings) in `tz_name`
+
+    Day keys are YYYY-MM-DD and clock strings HH:MM:SS, both in local time;
+    None inputs give None outputs.
+    """
+    tz = ZoneInfo(tz_name)
+    valid = [ms for ms in epoch_ms if ms is not None]
+    if not valid:
+        return [None] * len(epoch_ms), [None] * len(epoch_ms)
+
+    np = numpy_module()
+    if np is not None:
+        ms = np.array(valid, dtype='int64')
+        hours, inverse = np.unique(ms // MS_PER_HOUR, return_inverse=True)
+        offsets = _hour_offsets(hours.tolist(), tz)
+        offset_arr = np.array([offsets[h] for h in hours.tolist()], dtype='int64')
+        local = (ms // 1000 + offset_arr[inverse]).astype('datetime64[s]')
+        stamps = iter(np.datetime_as_string(local, unit='s').tolist())
+
+        days, clocks = [], []
+        for value in epoch_ms:
+            if value is None:
+                days.append(None)
+                clocks.append(None)
+            else:
+                stamp = next(stamps)
+                days.append(stamp[:10])
+                clocks.append(stamp[11:19])
+        return days, clocks
+
+    offsets = _hour_offsets({ms // MS_PER_HOUR for ms in valid}, tz)
+    day_names = {}
+    days, clocks = [], []
+    for value in epoch_ms:
+        if value is None:
+            days.append(None)
+            clocks.append(None)
+            continue
+        local = value // 1000 + offsets[value // MS_PER_HOUR]
+        day_num, seconds = divmod(local, 86400)
+        day = day_names.get(day_num)
+        if day is None:
+            day = day_names[day_num] = date.fromordinal(EPOCH_ORDINAL + day_num).isoformat()
+        hours, seconds = divmod(seconds, 3600)
+        minutes, seconds = divmod(seconds, 60)
+        days.append(day)
+        clocks.append(f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+    return days, clocks
+
+
+def local_now(tz_name):
+    """The current time in `tz_name`, so "today" is the same day lifelogs are bucketed into"""
+    return datetime.now(ZoneInfo(tz_name)) if tz_name else datetime.now()
+
+
+def localize(values, tz_name):
+    """Parse ISO-8601 strings and return (day keys, clock strings) in `tz_name`"""
+    return localize_epoch_ms(parse_epoch_ms(values), tz_name)
+
+
+def local_clocks(lifelogs, tz_name):
+    """Map every contents startTime in `lifelogs` to its local HH:MM:SS"""
+    values = list({
+        item['startTime']
+        for log in lifelogs
+        for item in (log.get('contents') or [])
+        if item.get('startTime')
+    })
+    _, clocks = localize(values, tz_name)
+    return dict(zip(values, clocks))